@@ -0,0 +1,65 @@
+import argparse
+import os
+import random
+import sys
+
+# Add parent directory to path so we can import src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from src.agent import TUITION_SYSTEM_PROMPT
+from src.compaction import compact_messages
+
+FILLER = ("Students admitted to the university join a vibrant community of scholars, with access to "
+          "residential colleges, research opportunities, athletics and more than three hundred clubs. ").split()
+
+def synthetic_page(rng: random.Random, chars: int, source: str) -> str:
+    """Scraped-page stand-in: prose with the odd line of figures, like a cost-of-attendance page."""
+    lines = [f"SOURCE: {source}"]
+    size = 0
+    while size < chars:
+        if rng.random() < 0.08:
+            line = f"{rng.choice(['Tuition', 'Room and board', 'Fees', 'Books'])}: ${rng.randint(1, 70)},{rng.randint(100, 999)}"
+        else:
+            line = " ".join(rng.choice(FILLER) for _ in range(rng.randint(12, 30)))
+        lines.append(line)
+        size += len(line) + 1
+    return "\n".join(lines)[:chars]
+
+def research_run(rng: random.Random, scrapes: int, page_chars: int) -> list:
+    """Message list of a tuition run: one search, then `scrapes` page scrapes."""
+    messages = [SystemMessage(content=TUITION_SYSTEM_PROMPT), HumanMessage(content="Find the per-year tuition cost for Example University")]
+    messages.append(AIMessage(content="", tool_calls=[{"name": "web_search", "args": {"query": "Example University tuition"}, "id": "call-0"}]))
+    results = "\n".join(f"Title: Result {i}\nLink: https://example.edu/page{i}\nSnippet: Tuition and fees for 2025-2026 are ${rng.randint(40, 65)},000.\n" for i in range(5))
+    messages.append(ToolMessage(content=results, tool_call_id="call-0", name="web_search"))
+    for i in range(1, scrapes + 1):
+        url = f"https://example.edu/page{i}"
+        messages.append(AIMessage(content="", tool_calls=[{"name": "scrape_webpage", "args": {"url": url, "focus": "tuition fees"}, "id": f"call-{i}"}]))
+        messages.append(ToolMessage(content=synthetic_page(rng, page_chars, url), tool_call_id=f"call-{i}", name="scrape_webpage"))
+    return messages
+
+def main():
+    parser = argparse.ArgumentParser(description="Tokens sent to the research model per ReAct step, with and without compaction.")
+    parser.add_argument("--scrapes", type=int, default=3)
+    parser.add_argument("--page-chars", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    messages = research_run(random.Random(args.seed), args.scrapes, args.page_chars)
+    # The model is called once up front and once after every tool result
+    step_ends = [2] + [i + 1 for i, m in enumerate(messages) if isinstance(m, ToolMessage)]
+
+    print(f"{'step':>4} {'messages':>9} {'tokens before':>14} {'tokens after':>13}")
+    total_before = total_after = 0
+    for step, end in enumerate(step_ends, start=1):
+        before = count_tokens_approximately(messages[:end])
+        after = count_tokens_approximately(compact_messages(messages[:end]))
+        total_before += before
+        total_after += after
+        print(f"{step:>4} {end:>9} {before:>14} {after:>13}")
+
+    print(f"\nTotal tokens sent: {total_before} -> {total_after} ({1 - total_after / total_before:.0%} fewer)")
+
+if __name__ == "__main__":
+    main()
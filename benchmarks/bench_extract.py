@@ -0,0 +1,63 @@
+import argparse
+import glob
+import os
+import re
+import sys
+import time
+
+# Add parent directory to path so we can import src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.extract import EXTRACTORS
+
+def word_overlap(reference: str, candidate: str) -> float:
+    """Share of the reference output's distinct words that the candidate also contains."""
+    ref_words = set(re.findall(r"\w+", reference.lower()))
+    if not ref_words:
+        return 1.0
+    cand_words = set(re.findall(r"\w+", candidate.lower()))
+    return len(ref_words & cand_words) / len(ref_words)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare HTML-to-text extraction backends on saved pages.")
+    parser.add_argument("corpus", nargs="?", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus"),
+                        help="Directory of saved .html pages (e.g. cost-of-attendance pages)")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--max-chars", type=int, default=10000)
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.corpus, "*.htm*")))
+    if not paths:
+        print(f"No .html files found in {args.corpus}. Save a few college pages there first.")
+        sys.exit(1)
+
+    backends = sorted(EXTRACTORS)
+    print(f"Backends: {', '.join(backends)} | pages: {len(paths)} | iterations: {args.iterations}\n")
+    print(f"{'page':40} {'KB':>7} " + " ".join(f"{name + ' ms':>10}" for name in backends) + f" {'overlap':>8}")
+
+    totals = {name: 0.0 for name in backends}
+    for path in paths:
+        with open(path, "rb") as f:
+            content = f.read()
+
+        outputs = {}
+        timings = {}
+        for name in backends:
+            extractor = EXTRACTORS[name]
+            start = time.perf_counter()
+            for _ in range(args.iterations):
+                outputs[name] = extractor(content, args.max_chars)
+            timings[name] = (time.perf_counter() - start) * 1000 / args.iterations
+            totals[name] += timings[name]
+
+        # bs4 is the current production output; report how much of it the fast path preserves
+        overlap = word_overlap(outputs["bs4"], outputs.get("lxml", outputs["bs4"]))
+        print(f"{os.path.basename(path)[:40]:40} {len(content) / 1024:7.0f} "
+              + " ".join(f"{timings[name]:10.2f}" for name in backends) + f" {overlap:8.1%}")
+
+    print("\nTotal ms per pass: " + ", ".join(f"{name}={totals[name]:.1f}" for name in backends))
+    if "lxml" in totals and totals["lxml"]:
+        print(f"Speedup lxml vs bs4: {totals['bs4'] / totals['lxml']:.1f}x")
+
+if __name__ == "__main__":
+    main()
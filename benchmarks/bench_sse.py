@@ -0,0 +1,87 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+from unittest.mock import patch
+
+# Add parent directory to path so we can import src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Measure the streaming protocol itself: no fact store, and no history folding
+# so the thread grows the way it did before summarization
+os.environ["FACT_STORE_ENABLED"] = "false"
+os.environ.setdefault("HISTORY_MAX_TURNS", "1000")
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.memory import MemorySaver
+from src.orchestrator import build_orchestrator_workflow
+from src.sse import format_chunk, orjson
+
+REPLY = ("Based on what we have so far, your expected net cost depends mostly on aid and housing. "
+         "Could you tell me whether you expect any additional scholarships, and whether you plan to live on campus? ") * 2
+RESEARCH = ("Tuition for 2025-2026 is $60,006 per year; room and board add $17,000 and fees $1,000. "
+            "Estimated total cost of attendance is about $80,000.\n") * 6 + "SOURCES:\nhttps://example.edu/costs\nhttps://example.edu/aid"
+
+OPENING = [
+    "I'm going to Rice University",
+    "I plan to major in economics",
+    "After graduating I want to live in Austin, TX",
+]
+
+class FakeModel:
+    async def ainvoke(self, inputs, config=None):
+        if isinstance(inputs, dict):
+            return {"messages": [AIMessage(content=RESEARCH)]}
+        return AIMessage(content=REPLY)
+
+async def record_thread(turns: int) -> list:
+    """Runs a `turns`-turn conversation and returns every raw chunk the server would stream."""
+    chunks = []
+    graph = build_orchestrator_workflow().compile(checkpointer=MemorySaver())
+    config = {"configurable": {"thread_id": "bench"}}
+    for turn in range(turns):
+        text = OPENING[turn] if turn < len(OPENING) else f"What if I get another $5,000 in aid? (question {turn})"
+        async for chunk in graph.astream({"messages": [HumanMessage(content=text)]}, config=config,
+                                         stream_mode=["values", "updates"], subgraphs=True):
+            chunks.append((turn,) + chunk)
+    return chunks
+
+def measure(chunks: list, mode: str, fast: bool):
+    """Bytes on the wire and seconds spent serializing when streaming `mode`."""
+    total_bytes = 0
+    per_turn = {}
+    start = time.perf_counter()
+    for turn, namespace, chunk_type, data in chunks:
+        if chunk_type != mode:
+            continue
+        frame = format_chunk(namespace, chunk_type, data, fast=fast)
+        if frame:
+            size = len(frame.encode("utf-8"))
+            total_bytes += size
+            per_turn[turn] = per_turn.get(turn, 0) + size
+    return total_bytes, time.perf_counter() - start, per_turn
+
+def main():
+    parser = argparse.ArgumentParser(description="Bytes on the wire and serialization time of SSE values vs updates streaming.")
+    parser.add_argument("--turns", type=int, default=50)
+    args = parser.parse_args()
+
+    with patch("src.orchestrator.get_model", return_value=FakeModel()), \
+         patch("src.orchestrator.get_agent", return_value=FakeModel()), \
+         patch("src.orchestrator._aextract_slots_with_llm", return_value={}):
+        chunks = asyncio.run(record_thread(args.turns))
+
+    encoders = [False] + ([True] if orjson is not None else [])
+    print(f"{args.turns}-turn thread, {len(chunks)} graph chunks\n")
+    print(f"{'mode':8} {'encoder':8} {'total KB':>10} {'last turn KB':>13} {'serialize ms':>13}")
+    for mode in ("values", "updates"):
+        for fast in encoders:
+            total_bytes, seconds, per_turn = measure(chunks, mode, fast)
+            print(f"{mode:8} {'orjson' if fast else 'json':8} {total_bytes / 1024:10.1f} "
+                  f"{per_turn.get(args.turns - 1, 0) / 1024:13.1f} {seconds * 1000:13.1f}")
+    if orjson is None:
+        print("\norjson is not installed; only the standard library encoder was measured.")
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,9 @@ from mcp.server.fastmcp import FastMCP
 from langchain_core.messages import SystemMessage
 from src.agent import get_agent, SYSTEM_PROMPT, SALARY_AGENT_PROMPT, TAX_AGENT_PROMPT, COST_OF_LIVING_AGENT_PROMPT
 from src.orchestrator import get_orchestrator_graph
+from src.singleflight import research_flights, flight_key
+from src.research import BatchComparison, CollegeTarget, compare_parallelism, compare_size_error
+from typing import List
 from langchain_core.messages import HumanMessage
 import asyncio
 
@@ -25,22 +28,17 @@ async def get_college_tuition(college_name: str) -> str:
         ("user", f"Find the per-year tuition cost for {college_name}")
     ]}
     
-    try:
-        # Since agent.invoke is synchronous (based on previous usage in server.py), 
-        # we can wrap it if needed or just call it directly.
-        # But FastMCP handles sync functions too. 
-        # Let's check if agent.invoke is async or sync. 
-        # In server.py it was called synchronously: result = agent.invoke(inputs)
-        # However, we are in an async function here. 
-        # To avoid blocking the event loop, we should run it in an executor.
-        
-        loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(None, agent.invoke, inputs)
+    async def research():
+        # The research tools have native async implementations, so the agent
+        # can run directly on the event loop without tying up an executor thread.
+        result = await agent.ainvoke(inputs)
         
         # The last message is the result from the assistant
-        full_content = result["messages"][-1].content
-        
-        return full_content
+        return result["messages"][-1].content
+
+    try:
+        # Concurrent calls for the same college share one research run
+        return await research_flights.do(flight_key("tuition", college_name), research)
     except Exception as e:
         return f"Error during agent execution: {str(e)}"
 
@@ -75,8 +73,7 @@ async def get_personalized_cost(college_name: str, family_contribution: int, fin
     ]}
     
     try:
-        loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(None, agent.invoke, inputs)
+        result = await agent.ainvoke(inputs)
         
         full_content = result["messages"][-1].content
         return full_content
@@ -104,10 +101,12 @@ async def get_expected_salary(college_name: str, major: str = "") -> str:
         ("user", query)
     ]}
     
-    try:
-        loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(None, agent.invoke, inputs)
+    async def research():
+        result = await agent.ainvoke(inputs)
         return result["messages"][-1].content
+
+    try:
+        return await research_flights.do(flight_key("salary", college_name, major), research)
     except Exception as e:
         return f"Error during agent execution: {str(e)}"
 
@@ -128,10 +127,12 @@ async def get_tax_rates(post_graduation_city_state: str) -> str:
         ("user", f"Find the state and local income tax rates for someone living and working in {post_graduation_city_state}")
     ]}
     
-    try:
-        loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(None, agent.invoke, inputs)
+    async def research():
+        result = await agent.ainvoke(inputs)
         return result["messages"][-1].content
+
+    try:
+        return await research_flights.do(flight_key("taxes", post_graduation_city_state), research)
     except Exception as e:
         return f"Error during agent execution: {str(e)}"
 
@@ -152,13 +153,45 @@ async def get_cost_of_living_ranges(post_graduation_city_state: str) -> str:
         ("user", f"Find the low, median, and high estimates for monthly rent, groceries, utilities, transportation, and healthcare in {post_graduation_city_state}")
     ]}
     
-    try:
-        loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(None, agent.invoke, inputs)
+    async def research():
+        result = await agent.ainvoke(inputs)
         return result["messages"][-1].content
+
+    try:
+        return await research_flights.do(flight_key("living_costs", post_graduation_city_state), research)
     except Exception as e:
         return f"Error during agent execution: {str(e)}"
 
+@mcp.tool()
+async def compare_colleges(colleges: List[CollegeTarget], parallelism: int = 0) -> str:
+    """
+    Compare tuition, expected salary and (when a location is given) post-graduation
+    taxes and cost of living for several colleges at once. Each entry needs a
+    college_name and may include a major and a post-graduation "City, ST" location.
+    """
+    # Same limits as REST /compare, reported as text since MCP tools return strings
+    error = compare_size_error(colleges)
+    if error:
+        return f"Error: {error}."
+
+    print(f"Comparing {len(colleges)} colleges...")
+    comparison = BatchComparison(colleges, compare_parallelism(parallelism or None))
+    try:
+        results = [result async for result in comparison.results()]
+    except Exception as e:
+        return f"Error during comparison: {str(e)}"
+
+    sections = []
+    for result in sorted(results, key=lambda r: r["index"]):
+        lines = [f"## {result['college_name']}"]
+        for topic in ("tuition", "salary", "taxes", "living_costs"):
+            if topic in result:
+                lines.append(f"### {topic.replace('_', ' ').title()}\n{result[topic]}")
+        for topic, error in result["errors"].items():
+            lines.append(f"### {topic.replace('_', ' ').title()}\nError: {error}")
+        sections.append("\n\n".join(lines))
+    return "\n\n".join(sections)
+
 @mcp.tool()
 async def chat_with_orchestrator(message: str, user_id: str = "default_user") -> str:
     """
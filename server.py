@@ -1,63 +1,60 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.responses import StreamingResponse
-from pydantic import BaseModel
-from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
-from src.agent import get_agent, SYSTEM_PROMPT
-from src.orchestrator import get_orchestrator_graph, OrchestratorState, orchestrator_node, tuition_node, salary_node, tax_node, cost_of_living_node
-from langgraph.graph import StateGraph, START, END
+from pydantic import BaseModel, ValidationError
+from langchain_core.messages import SystemMessage, HumanMessage, AIMessage, ToolMessage
+from src.agent import get_agent, warm_up, SYSTEM_PROMPT
+from src.orchestrator import build_orchestrator_workflow
+from src.http_client import aclose_async_client
+from src.cache import search_cache
+from src.rate_limit import rate_limiter
+from src.llm_cache import get_llm_cache
+from src.fact_store import get_fact_store
+from src.compaction import compaction_stats
+from src.singleflight import research_flights, flight_key
+from src.worker_pool import research_pool, PoolSaturated
+from src.jobs import JobManager, JobStore
+from src.sse import format_sse, format_chunk
+from src.research import BatchComparison, CollegeTarget, compare_parallelism, compare_size_error
 from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
 from contextlib import asynccontextmanager
+from typing import List, Optional
 import uvicorn
 import os
-import json
+import asyncio
 from fastapi.middleware.cors import CORSMiddleware
 
 # Global config to hold the compiled async graph
 async_graph = None
 db_conn_manager = None
+job_manager = None
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global async_graph, db_conn_manager
+    global async_graph, db_conn_manager, job_manager
     # Initialize the async sqlite connection for LangGraph
     db_conn_manager = AsyncSqliteSaver.from_conn_string("checkpoints.sqlite")
     memory = await db_conn_manager.__aenter__()
     
-    workflow = StateGraph(OrchestratorState)
+    async_graph = build_orchestrator_workflow().compile(checkpointer=memory)
     
-    workflow.add_node("orchestrator", orchestrator_node)
-    workflow.add_node("tuition_agent", tuition_node)
-    workflow.add_node("salary_agent", salary_node)
-    workflow.add_node("tax_agent", tax_node)
-    workflow.add_node("cost_of_living_agent", cost_of_living_node)
-    
-    workflow.add_edge(START, "orchestrator")
-    
-    def route_orchestrator(state: OrchestratorState):
-        last_message = state["messages"][-1].content
-        if "[ROUTE: TUITION]" in last_message:
-            return "tuition_agent"
-        elif "[ROUTE: SALARY]" in last_message:
-            return "salary_agent"
-        elif "[ROUTE: TAX]" in last_message:
-            return "tax_agent"
-        elif "[ROUTE: COST_OF_LIVING]" in last_message:
-            return "cost_of_living_agent"
-        return END
-
-    workflow.add_conditional_edges("orchestrator", route_orchestrator)
-    
-    workflow.add_edge("tuition_agent", "orchestrator")
-    workflow.add_edge("salary_agent", "orchestrator")
-    workflow.add_edge("tax_agent", "orchestrator")
-    workflow.add_edge("cost_of_living_agent", "orchestrator")
+    # Build the shared model clients and research agent once, before the first request
+    try:
+        for name, ms in warm_up().items():
+            print(f"Built {name} in {ms} ms")
+    except Exception as e:
+        print(f"Agent warm-up skipped: {e}")
     
-    async_graph = workflow.compile(checkpointer=memory)
+    # Background research jobs; unfinished ones from a previous run are queued again
+    job_manager = build_job_manager()
+    await job_manager.start()
     
     yield
     
     # Cleanup on shutdown
+    await job_manager.stop()
     await db_conn_manager.__aexit__(None, None, None)
+    await aclose_async_client()
+    research_pool.shutdown()
 
 app = FastAPI(title="College ROI Agent API", description="API to get college tuition information using an AI agent.", lifespan=lifespan)
 
@@ -95,6 +92,64 @@ class PersonalizedCostRequest(BaseModel):
 async def root():
     return {"message": "Welcome to the College ROI Agent API. Use /college/{college_name} to get tuition info."}
 
+@app.get("/stats")
+async def get_stats():
+    """
+    Runtime counters for the research pipeline's caches and outbound traffic.
+    """
+    llm_cache = get_llm_cache()
+    fact_store = get_fact_store()
+    return {
+        "search_cache": search_cache.stats(),
+        "rate_limiter": rate_limiter.stats(),
+        "llm_cache": llm_cache.stats() if llm_cache else {},
+        "fact_store": fact_store.stats() if fact_store else {},
+        "agent_compaction": compaction_stats.stats(),
+        "single_flight": research_flights.stats(),
+        "worker_pool": research_pool.stats(),
+        "jobs": job_manager.store.stats() if job_manager else {}
+    }
+
+def tuition_inputs(college_name: str) -> dict:
+    return {"messages": [
+        SystemMessage(content=SYSTEM_PROMPT),
+        ("user", f"Find the per-year tuition cost for {college_name}")
+    ]}
+
+def personalized_cost_inputs(request: PersonalizedCostRequest) -> dict:
+    prompt = f"""Find the per-year tuition cost for {request.college_name}. 
+    Then, using the following financial details:
+    - Family Contribution: ${request.family_contribution}
+    - Expected Financial Aid: ${request.financial_aid}
+    
+    Calculate:
+    1. The Net Price (Total Cost - Financial Aid)
+    2. The Remaining Gap (Net Price - Family Contribution)
+    
+    Provide a clear breakdown of the costs, aid, and what the family still needs to cover.
+    """
+
+    return {"messages": [
+        SystemMessage(content=SYSTEM_PROMPT),
+        ("user", prompt)
+    ]}
+
+def split_sources(full_content: str):
+    """Splits an agent answer into (text, source URLs listed after "SOURCES:")."""
+    sources = []
+    clean_content = full_content
+    
+    if "SOURCES:" in full_content:
+        parts = full_content.split("SOURCES:")
+        clean_content = parts[0].strip()
+        sources_text = parts[1].strip()
+        sources = [line.strip() for line in sources_text.split('\n') if line.strip() and line.strip().startswith('http')]
+    return clean_content, sources
+
+def saturated_error(e: PoolSaturated) -> HTTPException:
+    """503 with a Retry-After hint for requests the research worker pool has no room for."""
+    return HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
 @app.get("/college/{college_name}", response_model=CollegeResponse)
 async def get_college_tuition(college_name: str):
     """
@@ -107,27 +162,24 @@ async def get_college_tuition(college_name: str):
 
     print(f"Researching tuition for: {college_name}...")
     
-    inputs = {"messages": [
-        SystemMessage(content=SYSTEM_PROMPT),
-        ("user", f"Find the per-year tuition cost for {college_name}")
-    ]}
+    inputs = tuition_inputs(college_name)
     
-    try:
+    def research():
         result = agent.invoke(inputs)
         # The last message is the result from the assistant
-        full_content = result["messages"][-1].content
-        
-        # Parse out sources
-        sources = []
-        clean_content = full_content
-        
-        if "SOURCES:" in full_content:
-            parts = full_content.split("SOURCES:")
-            clean_content = parts[0].strip()
-            sources_text = parts[1].strip()
-            sources = [line.strip() for line in sources_text.split('\n') if line.strip() and line.strip().startswith('http')]
+        return result["messages"][-1].content
 
+    try:
+        # Concurrent requests for the same college share one research run, which
+        # takes a single slot in the bounded worker pool
+        full_content = await research_flights.do(
+            flight_key("tuition", college_name), lambda: research_pool.run(research)
+        )
+        
+        clean_content, sources = split_sources(full_content)
         return CollegeResponse(college_name=college_name, tuition_info=clean_content, sources=sources)
+    except PoolSaturated as e:
+        raise saturated_error(e)
     except Exception as e:
         print(f"Error during agent execution: {e}")
         raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
@@ -141,12 +193,37 @@ async def create_thread():
     thread_id = str(uuid.uuid4())
     return {"id": thread_id, "thread_id": thread_id}
 
+# The LangGraph API calls the (message, metadata) stream "messages-tuple"; the Python graph calls it "messages"
+STREAM_MODE_ALIASES = {"messages-tuple": "messages"}
+
+async def graph_events(graph, inputs, config, stream_modes):
+    """
+    Runs the graph and yields LangGraph API-compatible SSE frames.
+
+    Research agents run as subgraphs of their orchestrator node, so the graph is
+    streamed with `subgraphs=True`: their tool calls, tool results and answer tokens
+    are forwarded as `messages-tuple` events while the agent is still working, with
+    `parent_node` in the metadata naming the orchestrator node they belong to.
+    `values` events re-send the whole top-level thread state after every step;
+    `updates` events carry only what each step changed, so a long thread costs
+    the same per step as a short one.
+    """
+    if isinstance(stream_modes, str):
+        stream_modes = [stream_modes]
+    graph_modes = list(dict.fromkeys(STREAM_MODE_ALIASES.get(mode, mode) for mode in stream_modes))
+
+    async for namespace, chunk_type, chunk_data in graph.astream(inputs, config=config, stream_mode=graph_modes, subgraphs=True):
+        frame = format_chunk(namespace, chunk_type, chunk_data)
+        if frame is not None:
+            yield frame
+
 @app.post("/threads/{thread_id}/runs/stream")
 async def stream_run(thread_id: str, request: Request):
     """
     Execute a step on the LangGraph thread using the provided input messages
     and stream back the LangGraph API-compatible Server-Sent Events.
     React's `useStream` hook expects `messages-tuple` and `values` chunks to be serialized.
+    Pass `"stream_mode": ["messages-tuple", "updates"]` to receive per-step deltas instead of full states.
     """
     body = await request.json()
     input_data = body.get("input", {})
@@ -174,66 +251,15 @@ async def stream_run(thread_id: str, request: Request):
     inputs = {"messages": formatted_messages}
     
     stream_modes = body.get("stream_mode", ["messages-tuple", "values"])
+    config = {"configurable": {"thread_id": thread_id}}
 
     async def generate_chat_stream():
-        config = {"configurable": {"thread_id": thread_id}}
-        
         try:
-            # Iterate over the raw stream chunks and format them into LangGraph SSE protocol
-            async for chunk_type, chunk_data in async_graph.astream(inputs, config=config, stream_mode=stream_modes):
-                # For messages-tuple, the React Hook expects raw message metadata and the message object
-                if chunk_type == "messages-tuple":
-                    message_obj, metadata = chunk_data
-                    
-                    chunk_payload = {
-                        "event": "messages-tuple",
-                        "data": [
-                            {
-                                "content": message_obj.content,
-                                "id": getattr(message_obj, "id", str(uuid.uuid4())),
-                                "type": getattr(message_obj, "type", "ai"),
-                                "response_metadata": getattr(message_obj, "response_metadata", {})
-                            },
-                            metadata
-                        ]
-                    }
-                
-                elif chunk_type == "values":
-                    data_messages = []
-                    if "messages" in chunk_data:
-                        for m in chunk_data["messages"]:
-                            data_messages.append({
-                                "content": m.content,
-                                "id": getattr(m, "id", str(uuid.uuid4())),
-                                "type": getattr(m, "type", "human" if m.type == "human" else "ai")
-                            })
-                    
-                    state_copy = {}
-                    for k, v in chunk_data.items():
-                        if k != "messages":
-                            state_copy[k] = v
-                            
-                    chunk_payload = {
-                        "event": "values",
-                        "data": {
-                            **state_copy,
-                            "messages": data_messages
-                        }
-                    }
-                else:
-                    continue
-                    
-                # Yield SSE formatted string natively without intermediate JSON parsing where possible
-                try:
-                    json_str = json.dumps(chunk_payload['data'])
-                    yield f"event: {chunk_payload['event']}\\ndata: {json_str}\\n\\n"
-                except Exception as e:
-                    print(f"Skipping un-serializable chunk: {e}")
-                
+            async for event in graph_events(async_graph, inputs, config, stream_modes):
+                yield event
         except Exception as e:
             print(f"Error in orchestrator stream: {e}")
-            error_payload = {"error": str(e)}
-            yield f"event: error\\ndata: {json.dumps(error_payload)}\\n\\n"
+            yield format_sse("error", {"error": str(e)})
 
     return StreamingResponse(generate_chat_stream(), media_type="text/event-stream")
 
@@ -247,29 +273,166 @@ async def get_personalized_cost(request: PersonalizedCostRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error initializing agent: {str(e)}")
 
-    prompt = f"""Find the per-year tuition cost for {request.college_name}. 
-    Then, using the following financial details:
-    - Family Contribution: ${request.family_contribution}
-    - Expected Financial Aid: ${request.financial_aid}
-    
-    Calculate:
-    1. The Net Price (Total Cost - Financial Aid)
-    2. The Remaining Gap (Net Price - Family Contribution)
-    
-    Provide a clear breakdown of the costs, aid, and what the family still needs to cover.
-    """
-
-    inputs = {"messages": [
-        SystemMessage(content=SYSTEM_PROMPT),
-        ("user", prompt)
-    ]}
+    inputs = personalized_cost_inputs(request)
     
     try:
-        result = agent.invoke(inputs)
+        result = await research_pool.run(agent.invoke, inputs)
         return {"response": result["messages"][-1].content}
+    except PoolSaturated as e:
+        raise saturated_error(e)
     except Exception as e:
         print(f"Error during agent execution: {e}")
         raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
 
+def research_with_progress(inputs: dict, emit) -> str:
+    """
+    Runs the research agent, reporting each tool call and tool result through `emit`,
+    and returns the final answer.
+    """
+    answer = ""
+    for update in get_agent().stream(inputs, stream_mode="updates"):
+        for output in update.values():
+            for message in (output or {}).get("messages", []):
+                if isinstance(message, AIMessage) and message.tool_calls:
+                    for call in message.tool_calls:
+                        emit({"type": "tool_call", "tool": call["name"], "args": call["args"]})
+                elif isinstance(message, ToolMessage):
+                    emit({"type": "tool_result", "tool": message.name, "chars": len(str(message.content))})
+                elif isinstance(message, AIMessage):
+                    answer = message.content
+    return answer
+
+def run_tuition_job(params: dict, emit) -> dict:
+    content = research_with_progress(tuition_inputs(params["college_name"]), emit)
+    clean_content, sources = split_sources(content)
+    return CollegeResponse(college_name=params["college_name"], tuition_info=clean_content, sources=sources).model_dump()
+
+def run_personalized_cost_job(params: dict, emit) -> dict:
+    request = PersonalizedCostRequest(**params)
+    return {"college_name": request.college_name, "response": research_with_progress(personalized_cost_inputs(request), emit)}
+
+# Job kind -> (parameter model, blocking runner)
+JOB_KINDS = {
+    "tuition": (CollegeRequest, run_tuition_job),
+    "personalized_cost": (PersonalizedCostRequest, run_personalized_cost_job),
+}
+
+class JobRequest(BaseModel):
+    kind: str
+    params: dict
+
+def build_job_manager() -> JobManager:
+    return JobManager(
+        JobStore(os.getenv("JOB_STORE_PATH", "jobs.sqlite")),
+        runners={kind: runner for kind, (_, runner) in JOB_KINDS.items()},
+        workers=int(os.getenv("JOB_WORKERS", "2")),
+        reuse_ttl=float(os.getenv("JOB_REUSE_TTL", "3600")),
+        retention=float(os.getenv("JOB_RETENTION", str(7 * 24 * 3600)))
+    )
+
+def get_job_or_404(job_id: str) -> dict:
+    job = job_manager.store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+@app.post("/jobs", status_code=202)
+async def submit_job(request: JobRequest):
+    """
+    Queue a research job and return its id immediately. Kinds: `tuition`
+    (params: college_name) and `personalized_cost` (params as for /personalized-cost).
+    An identical job that is still running, or finished recently, is returned instead of starting a new one.
+    """
+    if request.kind not in JOB_KINDS:
+        raise HTTPException(status_code=422, detail=f"Unknown job kind '{request.kind}', expected one of {sorted(JOB_KINDS)}")
+    model, _ = JOB_KINDS[request.kind]
+    try:
+        params = model(**request.params).model_dump()
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+
+    job, created = job_manager.submit(request.kind, params)
+    return {"job_id": job["id"], "status": job["status"], "deduplicated": not created}
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Status, parameters and, once finished, the result or error of a job."""
+    return get_job_or_404(job_id)
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str, request: Request):
+    """
+    Server-Sent Events for a job: `status` changes, `progress` events (tool calls and
+    results) and a final `result` or `error`. Progress is stored with the job, so
+    late subscribers get the history first; send `Last-Event-ID` to resume.
+    """
+    get_job_or_404(job_id)
+    try:
+        last_seq = int(request.headers.get("last-event-id", "0") or 0)
+    except ValueError:
+        # A malformed id from the client just replays the full history
+        last_seq = 0
+
+    async def generate_job_stream():
+        seq = last_seq
+        status = None
+        while True:
+            update = job_manager.watch(job_id)
+            # Runs on every exit, including a client disconnect closing the generator
+            try:
+                for seq, data in job_manager.store.events(job_id, after=seq):
+                    yield f"id: {seq}\n" + format_sse("progress", data)
+                job = job_manager.store.get(job_id)
+                if job is None:
+                    # Pruned while we were watching
+                    yield format_sse("error", {"error": f"Job {job_id} not found"})
+                    return
+                if job["status"] != status:
+                    status = job["status"]
+                    yield format_sse("status", {"status": status})
+                if status == "succeeded":
+                    yield format_sse("result", job["result"])
+                    return
+                if status == "failed":
+                    yield format_sse("error", {"error": job["error"]})
+                    return
+                try:
+                    await asyncio.wait_for(update.wait(), timeout=15)
+                except asyncio.TimeoutError:
+                    # Comment line keeps proxies from closing an idle stream
+                    yield ": keep-alive\n\n"
+            finally:
+                job_manager.unwatch(job_id, update)
+
+    return StreamingResponse(generate_job_stream(), media_type="text/event-stream")
+
+class CompareRequest(BaseModel):
+    colleges: List[CollegeTarget]
+    parallelism: Optional[int] = None
+
+@app.post("/compare")
+async def compare_colleges(request: CompareRequest):
+    """
+    Research several colleges at once and stream one `college` event per school as
+    its results complete, then a `done` event with deduplication counts. Tax and
+    cost of living research is shared by every college with the same post-graduation city.
+    """
+    error = compare_size_error(request.colleges)
+    if error:
+        raise HTTPException(status_code=422, detail=error)
+
+    comparison = BatchComparison(request.colleges, compare_parallelism(request.parallelism))
+
+    async def generate_comparison_stream():
+        try:
+            async for result in comparison.results():
+                yield format_sse("college", result)
+            yield format_sse("done", comparison.stats())
+        except Exception as e:
+            print(f"Error in comparison stream: {e}")
+            yield format_sse("error", {"error": str(e)})
+
+    return StreamingResponse(generate_comparison_stream(), media_type="text/event-stream")
+
 if __name__ == "__main__":
     uvicorn.run("server:app", host="0.0.0.0", port=8000, reload=True)
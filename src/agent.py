@@ -1,37 +1,92 @@
 import os
+import time
+import threading
 from langchain_openai import ChatOpenAI
 from langgraph.prebuilt import create_react_agent
 from langchain_core.messages import SystemMessage
-from src.tools import web_search, scrape_webpage
+from src.tools import web_search, scrape_webpage, scrape_many
+from src.llm_cache import get_llm_cache
+from src.compaction import compact_observations, compaction_enabled
 from dotenv import load_dotenv
 
 load_dotenv()
 
-def get_agent():
-    # Initialize the model with OpenRouter
-    api_key = os.getenv("OPEN_ROUTER_API_KEY")
-    if not api_key:
-        raise ValueError("OPEN_ROUTER_API_KEY not found in environment variables")
-        
-    model = ChatOpenAI(
-        model="google/gemini-2.5-flash",
-        temperature=0,
-        api_key=api_key,
-        base_url="https://openrouter.ai/api/v1"
-    )
-    
-    tools = [web_search, scrape_webpage]
-    
-    # Create the ReAct agent
-    agent = create_react_agent(model, tools)
-    
-    return agent
+DEFAULT_MODEL = "google/gemini-2.5-flash"
+DEFAULT_TOOLS = (web_search, scrape_webpage, scrape_many)
+
+# Models and compiled agents are built once per configuration and shared by every
+# request: rebuilding them throws away the OpenRouter connection pool and recompiles the graph.
+_models = {}
+_agents = {}
+_registry_lock = threading.Lock()
+# Milliseconds spent building each registry entry, reported at startup
+build_times_ms = {}
+
+def get_llm(model_name: str = DEFAULT_MODEL, temperature: float = 0, streaming: bool = False):
+    """Returns the shared ChatOpenAI client for this configuration, creating it on first use."""
+    key = ("llm", model_name, temperature, streaming)
+    model = _models.get(key)
+    if model is not None:
+        return model
+
+    with _registry_lock:
+        if key not in _models:
+            # Initialize the model with OpenRouter
+            api_key = os.getenv("OPEN_ROUTER_API_KEY")
+            if not api_key:
+                raise ValueError("OPEN_ROUTER_API_KEY not found in environment variables")
+
+            start = time.perf_counter()
+            # An explicit streaming=False would stop the client from streaming even under
+            # LangGraph's "messages" mode, so the flag is only passed when it is turned on
+            options = {"streaming": True} if streaming else {}
+            _models[key] = ChatOpenAI(
+                model=model_name,
+                temperature=temperature,
+                api_key=api_key,
+                base_url="https://openrouter.ai/api/v1",
+                # Replaying a stored response is only equivalent to a new call when sampling is deterministic
+                cache=get_llm_cache() if temperature == 0 else None,
+                **options
+            )
+            build_times_ms[key] = round((time.perf_counter() - start) * 1000, 1)
+        return _models[key]
+
+def get_agent(tools=DEFAULT_TOOLS, model_name: str = DEFAULT_MODEL):
+    """
+    Returns the compiled ReAct research agent for this model and tool set.
+    Compiled graphs hold no per-run state, so one instance safely serves concurrent requests.
+    """
+    key = ("agent", model_name, tuple(t.name for t in tools))
+    agent = _agents.get(key)
+    if agent is not None:
+        return agent
+
+    model = get_llm(model_name)
+    with _registry_lock:
+        if key not in _agents:
+            start = time.perf_counter()
+            # Create the ReAct agent. Tool outputs the model has already used are
+            # re-sent as digests instead of in full on every later step
+            hook = compact_observations if compaction_enabled() else None
+            _agents[key] = create_react_agent(model, list(tools), pre_model_hook=hook)
+            build_times_ms[key] = round((time.perf_counter() - start) * 1000, 1)
+        return _agents[key]
+
+def warm_up() -> dict:
+    """
+    Builds the default agent and the streaming orchestrator model ahead of the first
+    request and returns the construction cost of each registry entry in milliseconds.
+    """
+    get_agent()
+    get_llm(streaming=True)
+    return {" / ".join(str(part) for part in key): ms for key, ms in build_times_ms.items()}
 
 TUITION_SYSTEM_PROMPT = """You are a helpful assistant designed to find the per-year tuition cost for a specific college.
 
 Your process should be:
 1. Search for the college's official tuition page (look for "cost of attendance", "tuition and fees", "room and board", etc.).
-2. Scrape the content of the most relevant page.
+2. Scrape the content of the most relevant page, passing focus keywords such as "tuition fees room board". If several pages look relevant, read them together with scrape_many.
 3. Analyze the text to find the specifics for "Tuition and Fees" and "Room and Board" for an undergraduate student.
 4. Report "Tuition and Fees" and "Room and Board" as separate values, and report the sum of the two as the cost-per-year.
 5. Differentiate between In-State and Out-of-State if applicable, but prioritize finding the general tuition or out-of-state tuition first.
@@ -48,7 +103,7 @@ SALARY_AGENT_PROMPT = """You are a helpful assistant designed to find the expect
 
 Your process should be:
 1. Search for the average starting salary or early-career pay for graduates of the provided college.
-2. Scrape the most relevant sources (e.g., PayScale, College Scorecard, university outcome reports).
+2. Scrape the most relevant sources (e.g., PayScale, College Scorecard, university outcome reports), passing focus keywords such as "median starting salary early career pay". Use scrape_many to read 2-3 sources in one step.
 3. Extract the average/median annual gross salary.
 4. Return the FINAL ANSWER as a clear summary of the expected starting annual gross salary.
 5. AT THE END of your response, strictly append a section titled "SOURCES:" followed by a list of the URLs you successfully scraped or used to find the information.
@@ -70,7 +125,7 @@ COST_OF_LIVING_AGENT_PROMPT = """You are a helpful assistant designed to find re
 
 Your process should be:
 1. Search the web for cost of living indices or rent averages (e.g., Numbeo, RentCafe, etc.) for the target city.
-2. Find minimum, median, and high estimates for typical monthly living expenses focusing on: Rent, Groceries, Utilities, Transportation, and Healthcare.
+2. Find minimum, median, and high estimates for typical monthly living expenses focusing on: Rent, Groceries, Utilities, Transportation, and Healthcare. When scraping, pass these categories as focus keywords, and use scrape_many to read 2-3 sources in one step.
 3. Synthesize this data to present reference ranges to the user.
 4. Return the FINAL ANSWER as a structured summary showing the Low, Median, and High estimates for each category so the user can be guided to input their own expected lifestyle costs.
 5. AT THE END of your response, strictly append a section titled "SOURCES:" followed by a list of the URLs you successfully scraped or used to find the information.
@@ -0,0 +1,213 @@
+import os
+import re
+import time
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Query parameters that only track the visitor and never change the page content
+TRACKING_PARAMS = ("utm_", "gclid", "fbclid", "mc_cid", "mc_eid", "_ga")
+
+def normalize_url(url: str) -> str:
+    """
+    Canonical form of a URL for cache keys: lowercase scheme/host, no default
+    port, no fragment, no trailing slash, tracking params dropped and the rest sorted.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower() or "http"
+    host = (parts.hostname or "").lower()
+    if parts.port and not ((scheme == "http" and parts.port == 80) or (scheme == "https" and parts.port == 443)):
+        host = f"{host}:{parts.port}"
+
+    path = parts.path or "/"
+    if len(path) > 1:
+        path = path.rstrip("/")
+
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith(TRACKING_PARAMS)
+    )
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+class PageEntry(NamedTuple):
+    url: str
+    text: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+
+    def is_fresh(self, ttl: float) -> bool:
+        return time.time() - self.fetched_at < ttl
+
+class PageCache:
+    """
+    On-disk cache of extracted page text, stored in SQLite.
+
+    Entries are addressed by the SHA-256 of the normalized URL. Each entry keeps
+    the ETag/Last-Modified validators from the response so an expired page can
+    be revalidated with a conditional request instead of re-downloaded.
+    Once the stored text exceeds `max_bytes`, least recently used entries are evicted.
+    """
+
+    def __init__(self, db_path: str, ttl: float, max_bytes: int):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                text TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS pages_accessed_at ON pages (accessed_at)")
+        self._conn.commit()
+
+    @staticmethod
+    def key_for(url: str) -> str:
+        return hashlib.sha256(normalize_url(url).encode("utf-8")).hexdigest()
+
+    def get(self, url: str) -> Optional[PageEntry]:
+        """Returns the stored entry for `url`, fresh or not, and marks it as recently used."""
+        key = self.key_for(url)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, text, etag, last_modified, fetched_at FROM pages WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE pages SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+        return PageEntry(*row)
+
+    def put(self, url: str, text: str, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        now = time.time()
+        size = len(text.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (key, url, text, etag, last_modified, fetched_at, accessed_at, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (self.key_for(url), url, text, etag, last_modified, now, now, size)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def refresh(self, url: str):
+        """Marks an entry as freshly fetched, e.g. after the server answered 304 Not Modified."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE pages SET fetched_at = ?, accessed_at = ? WHERE key = ?", (now, now, self.key_for(url))
+            )
+            self._conn.commit()
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute("SELECT key, size FROM pages ORDER BY accessed_at ASC").fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM pages WHERE key = ?", (key,))
+            total -= size
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM pages")
+            self._conn.commit()
+
+_page_cache = None
+_page_cache_lock = threading.Lock()
+
+def get_page_cache() -> Optional[PageCache]:
+    """
+    Returns the shared page cache, or None when disabled with PAGE_CACHE_TTL=0.
+    Configured through PAGE_CACHE_PATH, PAGE_CACHE_TTL (seconds) and PAGE_CACHE_MAX_MB.
+    """
+    global _page_cache
+    ttl = float(os.getenv("PAGE_CACHE_TTL", "86400"))
+    if ttl <= 0:
+        return None
+    if _page_cache is None:
+        with _page_cache_lock:
+            if _page_cache is None:
+                _page_cache = PageCache(
+                    db_path=os.getenv("PAGE_CACHE_PATH", "page_cache.sqlite"),
+                    ttl=ttl,
+                    max_bytes=int(float(os.getenv("PAGE_CACHE_MAX_MB", "200")) * 1024 * 1024)
+                )
+    return _page_cache
+
+# Filler words that don't change what DuckDuckGo returns for our research queries.
+# Names like "university"/"college" and years are kept: "Boston College" vs
+# "Boston University", or 2024 vs 2025 tuition, are different answers.
+STOPWORDS = frozenset({
+    "a", "an", "and", "the", "of", "for", "in", "on", "at", "to", "is", "are",
+    "what", "whats", "how", "much", "does", "do", "per", "by", "with", "me", "find"
+})
+
+def normalize_query(query: str) -> str:
+    """Case-, whitespace-, stopword- and order-insensitive form of a search query."""
+    tokens = re.findall(r"[a-z0-9$%]+", query.lower())
+    return " ".join(sorted({t for t in tokens if t not in STOPWORDS}))
+
+class TTLCache:
+    """Thread-safe in-memory LRU cache whose entries also expire after `ttl` seconds."""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and time.monotonic() - item[1] < self.ttl:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return item[0]
+            if item is not None:
+                del self._data[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic())
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+            }
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+search_cache = TTLCache(
+    max_entries=int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "2048")),
+    ttl=float(os.getenv("SEARCH_CACHE_TTL", "21600"))
+)
@@ -0,0 +1,104 @@
+import os
+import json
+import time
+import base64
+import hashlib
+import threading
+from typing import Optional
+from src.cache import normalize_url
+
+class CassetteMiss(LookupError):
+    """Raised in replay mode when no recording exists for a request."""
+
+class RecordedError(Exception):
+    """Raised in replay mode in place of an error the live request hit while recording."""
+
+class CassetteStore:
+    """
+    Directory of recorded HTTP exchanges, one JSON file per request.
+
+    Files are named by a hash of the method, normalized URL and form data, so
+    the same search query or page always maps to the same recording and a
+    store can be copied between machines. The default `cassettes/` directory is
+    git-ignored; point HTTP_CASSETTE_DIR elsewhere for a store you want to commit.
+
+    Requests that failed while recording (timeouts, rejected content types) are
+    stored with their error, so a replay fails the same way.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key_for(method: str, url: str, data=None) -> str:
+        body = json.dumps(sorted((data or {}).items()))
+        return hashlib.sha256(f"{method.upper()} {normalize_url(url)} {body}".encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def load(self, method: str, url: str, data=None) -> dict:
+        try:
+            with open(self._path(self.key_for(method, url, data)), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            raise CassetteMiss(f"no recorded response for {method.upper()} {url}")
+        if "error" not in entry:
+            entry["content"] = base64.b64decode(entry.pop("content_b64"))
+        return entry
+
+    def save(self, method: str, url: str, data, status_code: int, final_url: str, headers, content: bytes, truncated: bool):
+        entry = {
+            "method": method.upper(),
+            "url": url,
+            "data": data,
+            "status_code": status_code,
+            "final_url": final_url,
+            "headers": {k.lower(): v for k, v in headers.items()},
+            "content_b64": base64.b64encode(content).decode("ascii"),
+            "truncated": truncated,
+            "recorded_at": time.time()
+        }
+        self._write(self._path(self.key_for(method, url, data)), entry)
+
+    def save_error(self, method: str, url: str, data, error_type: str, message: str):
+        entry = {
+            "method": method.upper(),
+            "url": url,
+            "data": data,
+            "error": {"type": error_type, "message": message},
+            "recorded_at": time.time()
+        }
+        self._write(self._path(self.key_for(method, url, data)), entry)
+
+    def _write(self, path: str, entry: dict):
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            # Write-then-rename so a concurrent replay never reads a half-written file
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+
+def cassette_mode() -> str:
+    """`off` (live traffic), `record` (live traffic, saved) or `replay` (no network), from HTTP_CASSETTE_MODE."""
+    return os.getenv("HTTP_CASSETTE_MODE", "off").lower()
+
+def replay_latency() -> float:
+    """Artificial delay per replayed request, in seconds, from HTTP_REPLAY_LATENCY_MS."""
+    return float(os.getenv("HTTP_REPLAY_LATENCY_MS", "0")) / 1000
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_cassette_store() -> Optional[CassetteStore]:
+    """Returns the store in HTTP_CASSETTE_DIR, or None when recording/replay is off."""
+    global _store
+    if cassette_mode() not in ("record", "replay"):
+        return None
+    directory = os.getenv("HTTP_CASSETTE_DIR", "cassettes")
+    with _store_lock:
+        if _store is None or _store.directory != directory:
+            _store = CassetteStore(directory)
+    return _store
@@ -0,0 +1,109 @@
+import os
+import threading
+from typing import List
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from src.ranking import FIGURE_PATTERN
+
+def compaction_enabled() -> bool:
+    return os.getenv("AGENT_COMPACTION", "true").lower() in ("1", "true", "yes")
+
+def min_chars() -> int:
+    """Tool outputs shorter than this are re-sent as-is, from COMPACT_MIN_CHARS."""
+    return int(os.getenv("COMPACT_MIN_CHARS", "1500"))
+
+def digest_chars() -> int:
+    """Size budget for the digest that replaces a long tool output, from COMPACT_DIGEST_CHARS."""
+    return int(os.getenv("COMPACT_DIGEST_CHARS", "800"))
+
+# Lines that say where a figure came from
+LOCATOR_PREFIXES = ("SOURCE:", "Title:", "Link:")
+MAX_LINE_CHARS = 240
+
+def digest(text: str, budget: int) -> str:
+    """
+    Key lines of a tool output: dollar amounts, percentages and the source/title/link
+    lines that place them, in their original order and within `budget` characters.
+    """
+    lines = []
+    used = 0
+    for line in text.split("\n"):
+        line = line.strip()
+        if not line or not (FIGURE_PATTERN.search(line) or line.startswith(LOCATOR_PREFIXES)):
+            continue
+        if len(line) > MAX_LINE_CHARS:
+            line = line[:MAX_LINE_CHARS] + "..."
+        if used + len(line) + 1 > budget:
+            break
+        lines.append(line)
+        used += len(line) + 1
+    return "\n".join(lines)
+
+def _call_args(messages: List[BaseMessage]) -> dict:
+    """tool_call_id -> arguments the model passed, to label each digest with its URL or query."""
+    args = {}
+    for m in messages:
+        if isinstance(m, AIMessage):
+            for call in m.tool_calls:
+                args[call["id"]] = call["args"]
+    return args
+
+def compact_messages(messages: List[BaseMessage]) -> List[BaseMessage]:
+    """
+    Copy of a ReAct message list in which tool outputs the model has already
+    reasoned over (any followed by a later AI message) are replaced by short
+    digests. Outputs from the latest tool step are always kept verbatim.
+    """
+    last_ai = max((i for i, m in enumerate(messages) if isinstance(m, AIMessage)), default=-1)
+    threshold = min_chars()
+    budget = digest_chars()
+    call_args = _call_args(messages)
+
+    compacted = []
+    for i, m in enumerate(messages):
+        if isinstance(m, ToolMessage) and i < last_ai and isinstance(m.content, str) and len(m.content) > threshold:
+            args = call_args.get(m.tool_call_id, {})
+            target = args.get("url") or args.get("query") or ", ".join(args.get("urls", []))
+            header = f"[Earlier {m.name or 'tool'} result for {target or 'this call'}, {len(m.content)} chars, compacted to key lines]"
+            body = digest(m.content, budget) or "(no figures found)"
+            m = m.model_copy(update={"content": f"{header}\n{body}"})
+        compacted.append(m)
+    return compacted
+
+class CompactionStats:
+    """Approximate tokens sent to the research model per ReAct step, with and without compaction."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.steps = 0
+        self.tokens_before = 0
+        self.tokens_after = 0
+
+    def record(self, before: int, after: int):
+        with self._lock:
+            self.steps += 1
+            self.tokens_before += before
+            self.tokens_after += after
+
+    def stats(self) -> dict:
+        with self._lock:
+            if not self.steps:
+                return {"steps": 0}
+            return {
+                "steps": self.steps,
+                "avg_tokens_before": round(self.tokens_before / self.steps),
+                "avg_tokens_after": round(self.tokens_after / self.steps),
+                "saved": round(1 - self.tokens_after / self.tokens_before, 3) if self.tokens_before else 0.0
+            }
+
+compaction_stats = CompactionStats()
+
+def compact_observations(state) -> dict:
+    """
+    pre_model_hook for the research agent. Only the model's input is compacted
+    (`llm_input_messages`); the agent state keeps the full tool outputs.
+    """
+    messages = state["messages"]
+    compacted = compact_messages(messages)
+    compaction_stats.record(count_tokens_approximately(messages), count_tokens_approximately(compacted))
+    return {"llm_input_messages": compacted}
@@ -0,0 +1,130 @@
+import os
+from bs4 import BeautifulSoup, UnicodeDammit
+
+try:
+    import lxml.html as lxml_html
+    from lxml.etree import ParserError
+except ImportError:  # lxml is optional; fall back to the pure-Python parser
+    lxml_html = None
+
+# Subtrees that never hold page content worth sending to the agent
+SKIP_TAGS = frozenset({"script", "style", "noscript", "template", "svg", "iframe", "nav", "footer"})
+
+# Tags that start a new line, so table cells and list items don't run together
+BLOCK_TAGS = frozenset({
+    "p", "div", "br", "li", "ul", "ol", "tr", "td", "th", "table", "thead", "tbody",
+    "h1", "h2", "h3", "h4", "h5", "h6", "section", "article", "main", "header",
+    "aside", "dl", "dt", "dd", "blockquote", "pre", "form", "title", "caption"
+})
+
+def _phrases(line: str) -> list:
+    # Break multi-headlines into a line each and drop blank ones
+    return [phrase.strip() for phrase in line.split("  ") if phrase.strip()]
+
+class _TextCollector:
+    """
+    Turns a stream of raw text nodes into stripped, non-blank lines and
+    reports when `max_chars` have been collected so the walker can stop.
+    """
+
+    def __init__(self, max_chars: int):
+        self.max_chars = max_chars
+        self.chunks = []
+        self.size = 0
+        self.pending = ""
+
+    def feed(self, string: str) -> bool:
+        self.pending += string
+        if "\n" not in self.pending:
+            return False
+        *lines, self.pending = self.pending.split("\n")
+        for line in lines:
+            for phrase in _phrases(line):
+                self.chunks.append(phrase)
+                self.size += len(phrase) + 1
+        return self.size > self.max_chars
+
+    def text(self, finished: bool = True) -> str:
+        if finished:
+            self.chunks.extend(_phrases(self.pending))
+            self.pending = ""
+        return '\n'.join(self.chunks)[:self.max_chars]
+
+def extract_text_bs4(content, max_chars: int) -> str:
+    """Reference backend: BeautifulSoup with the pure-Python html.parser."""
+    soup = BeautifulSoup(content, 'html.parser')
+
+    # Kill all script and style elements
+    for script in soup(["script", "style"]):
+        script.decompose()
+
+    collector = _TextCollector(max_chars)
+    # Walk the text nodes lazily and stop as soon as we have enough text,
+    # instead of materialising get_text() for the whole document
+    for string in soup.strings:
+        if collector.feed(string):
+            return collector.text(finished=False)
+    return collector.text()
+
+def extract_text_lxml(content, max_chars: int) -> str:
+    """
+    Fast backend: libxml2's C parser plus a single-pass walker that skips
+    navigation, footer and script subtrees without building any text copies.
+    """
+    if not content or not content.strip():
+        return ""
+    parser = None
+    if isinstance(content, bytes):
+        # libxml2 reads bytes without a <meta charset> as Latin-1; detect the encoding
+        # the way bs4 does so UTF-8 pages don't come out as mojibake
+        encoding = UnicodeDammit(content, is_html=True).original_encoding
+        if encoding:
+            parser = lxml_html.HTMLParser(encoding=encoding)
+    try:
+        root = lxml_html.fromstring(content, parser=parser)
+    except ParserError:
+        # Comment-only or otherwise empty documents have no root element
+        return ""
+
+    collector = _TextCollector(max_chars)
+    # Explicit stack instead of recursion: some CMS pages nest thousands of divs.
+    # Strings on the stack are text to emit, anything else is an element to expand.
+    stack = [root]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            if collector.feed(item):
+                return collector.text(finished=False)
+            continue
+
+        if item.tail:
+            stack.append(item.tail)
+        tag = item.tag
+        # Comments and processing instructions have a non-string tag; only their tail is text
+        if not isinstance(tag, str) or tag.lower() in SKIP_TAGS:
+            continue
+
+        block = tag.lower() in BLOCK_TAGS
+        if block:
+            stack.append("\n")
+        stack.extend(reversed(list(item)))
+        if item.text:
+            stack.append(item.text)
+        if block:
+            stack.append("\n")
+    return collector.text()
+
+EXTRACTORS = {"bs4": extract_text_bs4}
+if lxml_html is not None:
+    EXTRACTORS["lxml"] = extract_text_lxml
+
+def get_extractor(name: str = None):
+    """
+    Returns the extraction backend selected by `name` or SCRAPE_EXTRACTOR,
+    preferring lxml and falling back to bs4 when it isn't installed.
+    """
+    name = name or os.getenv("SCRAPE_EXTRACTOR", "lxml")
+    return EXTRACTORS.get(name, EXTRACTORS["bs4"])
+
+def extract_text(content, max_chars: int) -> str:
+    return get_extractor()(content, max_chars)
@@ -0,0 +1,135 @@
+import os
+import re
+import time
+import sqlite3
+import threading
+from datetime import date
+from typing import NamedTuple, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Which research targets each topic depends on. The first field is required;
+# the rest refine the key when known (salary for an undecided major is still useful).
+TOPIC_FIELDS = {
+    "tuition": ("college_name",),
+    "salary": ("college_name", "major"),
+    "taxes": ("location",),
+    "living_costs": ("location",),
+}
+
+# How long a researched answer stays valid, in seconds. Tuition is re-checked daily
+# so published changes show up quickly; tax rates change at most once a year.
+DEFAULT_FRESHNESS = {
+    "tuition": 24 * 3600,
+    "salary": 7 * 24 * 3600,
+    "taxes": 30 * 24 * 3600,
+    "living_costs": 7 * 24 * 3600,
+}
+
+def freshness(topic: str) -> float:
+    """Freshness window for `topic`, overridable with FACT_TTL_<TOPIC> (seconds)."""
+    return float(os.getenv(f"FACT_TTL_{topic.upper()}", DEFAULT_FRESHNESS[topic]))
+
+def canonical(value: str) -> str:
+    """Case-, punctuation- and whitespace-insensitive form of a college, major or location."""
+    return " ".join(re.findall(r"[a-z0-9&]+", (value or "").lower()))
+
+def academic_year(today: date = None) -> str:
+    """Academic year in effect on `today`: from July onwards, costs are quoted for the year starting that fall."""
+    today = today or date.today()
+    start = today.year if today.month >= 7 else today.year - 1
+    return f"{start}-{start + 1}"
+
+class FactKey(NamedTuple):
+    topic: str
+    college: str
+    major: str
+    location: str
+    academic_year: str
+
+def make_key(topic: str, college_name: str = "", major: str = "", location: str = "") -> Optional[FactKey]:
+    """
+    Canonical key for a research result, or None when the topic's required target is unknown.
+    Targets the topic does not depend on are left blank, so e.g. tax research for
+    "Detroit, MI" is shared by every college and major.
+    """
+    fields = TOPIC_FIELDS[topic]
+    values = {
+        "college_name": canonical(college_name),
+        "major": canonical(major),
+        "location": canonical(location),
+    }
+    if not values[fields[0]]:
+        return None
+    used = {name: (values[name] if name in fields else "") for name in values}
+    return FactKey(topic, used["college_name"], used["major"], used["location"], academic_year())
+
+class FactStore:
+    """
+    Research answers shared across users and threads, stored in SQLite.
+    A popular college or city is researched once per freshness window instead of once per user.
+    """
+
+    def __init__(self, db_path: str):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS facts (
+                topic TEXT NOT NULL,
+                college TEXT NOT NULL,
+                major TEXT NOT NULL,
+                location TEXT NOT NULL,
+                academic_year TEXT NOT NULL,
+                answer TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (topic, college, major, location, academic_year)
+            )
+        """)
+        self._conn.commit()
+
+    def get(self, key: FactKey) -> Optional[str]:
+        """Returns the stored answer for `key` if it is still within its topic's freshness window."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT answer, created_at FROM facts WHERE topic = ? AND college = ? AND major = ? "
+                "AND location = ? AND academic_year = ?", tuple(key)
+            ).fetchone()
+            if row is None or time.time() - row[1] >= freshness(key.topic):
+                self.misses += 1
+                return None
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: FactKey, answer: str):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO facts (topic, college, major, location, academic_year, answer, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)", tuple(key) + (answer, time.time())
+            )
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+            }
+
+_fact_store = None
+_fact_store_lock = threading.Lock()
+
+def get_fact_store() -> Optional[FactStore]:
+    """Returns the shared fact store at FACT_STORE_PATH, or None when FACT_STORE_ENABLED is false."""
+    global _fact_store
+    if os.getenv("FACT_STORE_ENABLED", "true").lower() not in ("1", "true", "yes"):
+        return None
+    if _fact_store is None:
+        with _fact_store_lock:
+            if _fact_store is None:
+                _fact_store = FactStore(os.getenv("FACT_STORE_PATH", "facts.sqlite"))
+    return _fact_store
@@ -0,0 +1,56 @@
+import os
+import re
+from typing import List, Tuple
+from langchain_core.messages import BaseMessage, HumanMessage
+
+def keep_turns() -> int:
+    """Most recent turns kept verbatim after a summarization, from HISTORY_KEEP_TURNS."""
+    return max(1, int(os.getenv("HISTORY_KEEP_TURNS", "3")))
+
+def max_turns() -> int:
+    """
+    Turns a thread may hold before older ones are folded into the summary, from
+    HISTORY_MAX_TURNS. Leaving headroom above keep_turns() means the summary is
+    rewritten every few turns rather than on every message.
+    """
+    return max(keep_turns(), int(os.getenv("HISTORY_MAX_TURNS", "6")))
+
+def turn_starts(messages: List[BaseMessage]) -> List[int]:
+    """Indices of the user messages that open each turn."""
+    return [i for i, m in enumerate(messages) if isinstance(m, HumanMessage)]
+
+def split_history(messages: List[BaseMessage], keep: int, limit: int) -> Tuple[List[BaseMessage], List[BaseMessage]]:
+    """
+    Splits the thread into (messages to fold into the summary, messages to keep).
+    Nothing is folded until the thread holds more than `limit` turns; then all but
+    the last `keep` turns are.
+    """
+    starts = turn_starts(messages)
+    if len(starts) <= limit:
+        return [], messages
+    cut = starts[-keep]
+    return messages[:cut], messages[cut:]
+
+# Source lists make up much of a research answer and are not worth summarizing
+SOURCES_SECTION = re.compile(r"\n\s*SOURCES?:.*", re.S | re.I)
+
+def render_transcript(messages: List[BaseMessage], max_chars: int = 2000) -> str:
+    """Plain-text transcript of `messages` for the summarizer, without source lists."""
+    lines = []
+    for m in messages:
+        content = m.content if isinstance(m.content, str) else str(m.content)
+        content = SOURCES_SECTION.sub("", content).strip()
+        if len(content) > max_chars:
+            content = content[:max_chars] + " [...]"
+        role = "User" if isinstance(m, HumanMessage) else "Assistant"
+        lines.append(f"{role}: {content}")
+    return "\n\n".join(lines)
+
+SUMMARY_PROMPT = """You maintain the running summary of a college ROI planning conversation.
+Update the existing summary with the new transcript excerpt. Keep:
+- every researched figure (tuition, room and board, starting salary, tax rates, monthly living costs) with the college, major or city it applies to
+- what the user decided, changed their mind about, or asked for
+Drop greetings, source URLs and repeated explanations. Answer with the updated summary only, in at most 200 words."""
+
+def summary_request(summary: str, folded: List[BaseMessage]) -> str:
+    return f"EXISTING SUMMARY:\n{summary or '(none)'}\n\nNEW TRANSCRIPT EXCERPT:\n{render_transcript(folded)}"
@@ -0,0 +1,236 @@
+import os
+import time
+import threading
+import weakref
+import asyncio
+import httpx
+import requests
+from typing import Mapping, NamedTuple, Optional
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from dotenv import load_dotenv
+from src.rate_limit import rate_limiter, RateLimitExceeded
+from src.cassette import get_cassette_store, cassette_mode, replay_latency, RecordedError
+
+load_dotenv()
+
+# Browser-like User-Agent; some college sites and DuckDuckGo reject the default python-requests one
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+
+# Pool sizing: how many distinct hosts keep a pool, and how many keep-alive connections per host
+POOL_HOSTS = int(os.getenv("HTTP_POOL_HOSTS", "32"))
+POOL_PER_HOST = int(os.getenv("HTTP_POOL_PER_HOST", "8"))
+
+# (connect, read) timeouts in seconds, passed to every request
+CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "10"))
+DEFAULT_TIMEOUT = (CONNECT_TIMEOUT, READ_TIMEOUT)
+
+# How long to hold back a host that answered 429/503 without a usable Retry-After
+THROTTLE_PENALTY = float(os.getenv("RATE_LIMIT_THROTTLE_PENALTY", "5"))
+
+# Response bodies are read in chunks of this size so a byte budget can cut them off early
+CHUNK_SIZE = 64 * 1024
+
+_session = None
+_session_lock = threading.Lock()
+
+# httpx.AsyncClient is bound to the event loop it was first used on, so keep one per loop
+_async_clients = weakref.WeakKeyDictionary()
+
+def get_session():
+    """
+    Returns the process-wide requests Session shared by the research tools.
+    Connections are kept alive and reused per host, so repeated calls to
+    DuckDuckGo or the same college site skip DNS, TCP and TLS setup.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=POOL_PER_HOST)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.headers.update({"User-Agent": USER_AGENT})
+                _session = session
+    return _session
+
+def close_session():
+    """Closes the shared session and its pooled connections."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+def get_async_client():
+    """
+    Returns the httpx AsyncClient for the running event loop.
+    Used by the async tool implementations so slow sites never block the loop.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            headers={"User-Agent": USER_AGENT},
+            timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=POOL_HOSTS * POOL_PER_HOST,
+                max_keepalive_connections=POOL_HOSTS * POOL_PER_HOST
+            ),
+            follow_redirects=True
+        )
+        _async_clients[loop] = client
+    return client
+
+async def aclose_async_client():
+    """Closes the AsyncClient belonging to the running event loop, if any."""
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+class UnsupportedContentType(ValueError):
+    """Raised when a response is not a content type the caller can use, e.g. a PDF."""
+
+class HTTPStatusError(Exception):
+    """Raised by `FetchResult.raise_for_status` for 4xx/5xx responses."""
+
+class FetchResult(NamedTuple):
+    status_code: int
+    url: str
+    headers: Mapping[str, str]
+    content: bytes
+    truncated: bool
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise HTTPStatusError(f"HTTP {self.status_code} for url: {self.url}")
+
+def _check_content_type(headers, allowed_types):
+    if not allowed_types:
+        return
+    content_type = headers.get("Content-Type", "").split(";")[0].strip().lower()
+    # A missing header is common on small college sites; let the parser decide
+    if content_type and content_type not in allowed_types:
+        raise UnsupportedContentType(f"unsupported content type {content_type}")
+
+def _has_body(status_code: int) -> bool:
+    # 304 carries no body; 4xx/5xx bodies are error pages that raise_for_status rejects anyway
+    return 200 <= status_code < 300
+
+def _note_throttling(host: str, status_code: int, headers):
+    if status_code not in (429, 503):
+        return
+    try:
+        penalty = float(headers.get("Retry-After", ""))
+    except ValueError:
+        penalty = THROTTLE_PENALTY
+    rate_limiter.penalize(host, penalty)
+
+def _live_fetch(method: str, url: str, data=None, headers=None, max_bytes: Optional[int] = None, allowed_types=None) -> FetchResult:
+    host = urlsplit(url).hostname
+    rate_limiter.acquire(host)
+    with get_session().request(method, url, data=data, headers=headers, timeout=DEFAULT_TIMEOUT, stream=True) as resp:
+        if not _has_body(resp.status_code):
+            _note_throttling(host, resp.status_code, resp.headers)
+            return FetchResult(resp.status_code, resp.url, resp.headers, b"", False)
+        _check_content_type(resp.headers, allowed_types)
+
+        body = bytearray()
+        truncated = False
+        for chunk in resp.iter_content(CHUNK_SIZE):
+            body.extend(chunk)
+            if max_bytes is not None and len(body) > max_bytes:
+                truncated = True
+                break
+        return FetchResult(resp.status_code, resp.url, resp.headers, bytes(body[:max_bytes]), truncated)
+
+async def _alive_fetch(method: str, url: str, data=None, headers=None, max_bytes: Optional[int] = None, allowed_types=None) -> FetchResult:
+    host = urlsplit(url).hostname
+    await rate_limiter.aacquire(host)
+    async with get_async_client().stream(method, url, data=data, headers=headers) as resp:
+        if not _has_body(resp.status_code):
+            _note_throttling(host, resp.status_code, resp.headers)
+            return FetchResult(resp.status_code, str(resp.url), resp.headers, b"", False)
+        _check_content_type(resp.headers, allowed_types)
+
+        body = bytearray()
+        truncated = False
+        async for chunk in resp.aiter_bytes(CHUNK_SIZE):
+            body.extend(chunk)
+            if max_bytes is not None and len(body) > max_bytes:
+                truncated = True
+                break
+        return FetchResult(resp.status_code, str(resp.url), resp.headers, bytes(body[:max_bytes]), truncated)
+
+# Errors raised by this module come back as their own type on replay; anything else as RecordedError
+_REPLAYED_ERRORS = {cls.__name__: cls for cls in (UnsupportedContentType,)}
+
+def _replayed(store, method: str, url: str, data, max_bytes: Optional[int], allowed_types) -> FetchResult:
+    entry = store.load(method, url, data)
+    if "error" in entry:
+        error = entry["error"]
+        raise _REPLAYED_ERRORS.get(error["type"], RecordedError)(error["message"])
+    result_headers = CaseInsensitiveDict(entry["headers"])
+    if _has_body(entry["status_code"]):
+        _check_content_type(result_headers, allowed_types)
+    content = entry["content"]
+    truncated = entry["truncated"] or (max_bytes is not None and len(content) > max_bytes)
+    return FetchResult(entry["status_code"], entry["final_url"], result_headers, content[:max_bytes], truncated)
+
+def _record(store, method: str, url: str, data, result: FetchResult):
+    # A 304 only makes sense next to the page cache entry it revalidated; keep the full recording instead
+    if result.status_code != 304:
+        store.save(method, url, data, result.status_code, result.url, result.headers, result.content, result.truncated)
+
+def _record_error(store, method: str, url: str, data, error: Exception):
+    # Our own limiter's back-pressure says nothing about the remote site
+    if not isinstance(error, RateLimitExceeded):
+        store.save_error(method, url, data, type(error).__name__, str(error))
+
+def fetch(method: str, url: str, data=None, headers=None, max_bytes: Optional[int] = None, allowed_types=None) -> FetchResult:
+    """
+    Performs a request on the shared session, streaming the body.
+    Reading stops once `max_bytes` have arrived, whether or not the response
+    declares a Content-Length, and the body is skipped entirely when the
+    Content-Type is not one of `allowed_types`.
+    Every request first waits for its host's slot in the shared rate limiter.
+
+    With HTTP_CASSETTE_MODE=record the exchange, or the error it raised, is also
+    saved to the cassette store; with HTTP_CASSETTE_MODE=replay it is served from the store instead of the network.
+    """
+    store = get_cassette_store()
+    if store is not None and cassette_mode() == "replay":
+        if replay_latency():
+            time.sleep(replay_latency())
+        return _replayed(store, method, url, data, max_bytes, allowed_types)
+
+    try:
+        result = _live_fetch(method, url, data, headers, max_bytes, allowed_types)
+    except Exception as e:
+        if store is not None:
+            _record_error(store, method, url, data, e)
+        raise
+    if store is not None:
+        _record(store, method, url, data, result)
+    return result
+
+async def afetch(method: str, url: str, data=None, headers=None, max_bytes: Optional[int] = None, allowed_types=None) -> FetchResult:
+    """Async counterpart of `fetch`, using the event loop's AsyncClient."""
+    store = get_cassette_store()
+    if store is not None and cassette_mode() == "replay":
+        if replay_latency():
+            await asyncio.sleep(replay_latency())
+        return _replayed(store, method, url, data, max_bytes, allowed_types)
+
+    try:
+        result = await _alive_fetch(method, url, data, headers, max_bytes, allowed_types)
+    except Exception as e:
+        if store is not None:
+            _record_error(store, method, url, data, e)
+        raise
+    if store is not None:
+        _record(store, method, url, data, result)
+    return result
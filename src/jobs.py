@@ -0,0 +1,260 @@
+import json
+import time
+import uuid
+import asyncio
+import hashlib
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+from src.fact_store import canonical
+
+TERMINAL_STATES = ("succeeded", "failed")
+
+def job_key(kind: str, params: dict) -> str:
+    """Dedupe key: the job kind plus its parameters, with text compared canonically."""
+    normalized = {k: canonical(v) if isinstance(v, str) else v for k, v in sorted(params.items())}
+    return hashlib.sha256(json.dumps([kind, normalized]).encode("utf-8")).hexdigest()
+
+class JobStore:
+    """
+    Research jobs and their progress events, stored in SQLite so that results and
+    event history survive restarts.
+    """
+
+    def __init__(self, db_path: str):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                params TEXT NOT NULL,
+                dedupe_key TEXT NOT NULL,
+                status TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_dedupe_key ON jobs (dedupe_key, created_at)")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS job_events (
+                job_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                data TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (job_id, seq)
+            )
+        """)
+        self._conn.commit()
+
+    @staticmethod
+    def _job(row) -> Optional[dict]:
+        if row is None:
+            return None
+        job = dict(row)
+        job["params"] = json.loads(job["params"])
+        job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+        del job["dedupe_key"]
+        return job
+
+    def create(self, kind: str, params: dict) -> dict:
+        now = time.time()
+        job_id = str(uuid.uuid4())
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, kind, params, dedupe_key, status, created_at, updated_at) VALUES (?, ?, ?, ?, 'queued', ?, ?)",
+                (job_id, kind, json.dumps(params), job_key(kind, params), now, now)
+            )
+            self._conn.commit()
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            return self._job(self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+
+    def find_reusable(self, kind: str, params: dict, max_age: float) -> Optional[dict]:
+        """An identical job that is still queued or running, or succeeded within `max_age` seconds."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM jobs WHERE dedupe_key = ? AND (status IN ('queued', 'running') "
+                "OR (status = 'succeeded' AND updated_at >= ?)) ORDER BY created_at DESC LIMIT 1",
+                (job_key(kind, params), time.time() - max_age)
+            ).fetchone()
+            return self._job(row)
+
+    def unfinished(self) -> List[str]:
+        """Jobs that were queued or running when the process last stopped, oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id FROM jobs WHERE status IN ('queued', 'running') ORDER BY created_at"
+            ).fetchall()
+            return [row["id"] for row in rows]
+
+    def set_status(self, job_id: str, status: str, result=None, error: str = None):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, updated_at = ? WHERE id = ?",
+                (status, json.dumps(result) if result is not None else None, error, time.time(), job_id)
+            )
+            self._conn.commit()
+
+    def add_event(self, job_id: str, data: dict) -> int:
+        with self._lock:
+            seq = self._conn.execute(
+                "SELECT COALESCE(MAX(seq), 0) + 1 FROM job_events WHERE job_id = ?", (job_id,)
+            ).fetchone()[0]
+            self._conn.execute(
+                "INSERT INTO job_events (job_id, seq, data, created_at) VALUES (?, ?, ?, ?)",
+                (job_id, seq, json.dumps(data, default=str), time.time())
+            )
+            self._conn.commit()
+            return seq
+
+    def events(self, job_id: str, after: int = 0) -> List[Tuple[int, dict]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, data FROM job_events WHERE job_id = ? AND seq > ? ORDER BY seq", (job_id, after)
+            ).fetchall()
+            return [(row["seq"], json.loads(row["data"])) for row in rows]
+
+    def prune(self, max_age: float) -> int:
+        """Deletes jobs that finished more than `max_age` seconds ago, with their events. Returns how many."""
+        with self._lock:
+            cutoff = time.time() - max_age
+            ids = [row["id"] for row in self._conn.execute(
+                "SELECT id FROM jobs WHERE status IN ('succeeded', 'failed') AND updated_at < ?", (cutoff,)
+            ).fetchall()]
+            if ids:
+                placeholders = ", ".join("?" * len(ids))
+                self._conn.execute(f"DELETE FROM job_events WHERE job_id IN ({placeholders})", ids)
+                self._conn.execute(f"DELETE FROM jobs WHERE id IN ({placeholders})", ids)
+                self._conn.commit()
+            return len(ids)
+
+    def stats(self) -> dict:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+            return {row["status"]: row["n"] for row in rows}
+
+# A runner does the blocking research for one job kind: runner(params, emit) -> result,
+# where emit(dict) records a progress event
+Runner = Callable[[dict, Callable[[dict], None]], dict]
+
+class JobManager:
+    """
+    Runs submitted jobs in the background on `workers` threads.
+
+    Identical submissions (same kind and canonical parameters) attach to the job
+    already queued or running, or reuse a result that succeeded within `reuse_ttl`
+    seconds. Jobs left unfinished by a restart are queued again on start(), and
+    finished jobs are deleted with their events `retention` seconds after they end.
+    """
+
+    def __init__(self, store: JobStore, runners: Dict[str, Runner], workers: int, reuse_ttl: float,
+                 retention: float = 7 * 24 * 3600):
+        self.store = store
+        self.runners = runners
+        self.workers = workers
+        self.reuse_ttl = reuse_ttl
+        self.retention = retention
+        self._executor = None
+        self._loop = None
+        self._queue = None
+        self._tasks = []
+        # job id -> one asyncio.Event per watcher, set on the next progress or status change
+        self._updates = {}
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="job")
+        for job_id in self.store.unfinished():
+            self.store.set_status(job_id, "queued")
+            self._queue.put_nowait(job_id)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._prune_periodically()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, kind: str, params: dict) -> Tuple[dict, bool]:
+        """Returns (job, created). `created` is False when an identical job was reused."""
+        if kind not in self.runners:
+            raise ValueError(f"unknown job kind: {kind}")
+        existing = self.store.find_reusable(kind, params, self.reuse_ttl)
+        if existing is not None:
+            return existing, False
+        job = self.store.create(kind, params)
+        self._queue.put_nowait(job["id"])
+        return job, True
+
+    def watch(self, job_id: str) -> asyncio.Event:
+        """
+        Event set on the job's next progress event or status change. Take it before
+        reading the store so an update between the read and the wait is not missed,
+        and hand it back to unwatch() once done waiting.
+        """
+        event = asyncio.Event()
+        self._updates.setdefault(job_id, set()).add(event)
+        return event
+
+    def unwatch(self, job_id: str, event: asyncio.Event):
+        """Forgets a watcher that stopped waiting, e.g. after a timeout or a client disconnect."""
+        events = self._updates.get(job_id)
+        if events is not None:
+            events.discard(event)
+            if not events:
+                del self._updates[job_id]
+
+    def _notify(self, job_id: str):
+        for event in self._updates.pop(job_id, ()):
+            event.set()
+
+    async def _prune_periodically(self):
+        while True:
+            try:
+                removed = await asyncio.to_thread(self.store.prune, self.retention)
+                if removed:
+                    print(f"Pruned {removed} finished job(s) older than {self.retention:.0f}s")
+            except Exception as e:
+                print(f"Job pruning failed: {e}")
+            await asyncio.sleep(min(self.retention, 3600))
+
+    def _emit(self, job_id: str, data: dict):
+        # Called from a worker thread
+        self.store.add_event(job_id, data)
+        self._loop.call_soon_threadsafe(self._notify, job_id)
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str):
+        job = self.store.get(job_id)
+        if job is None or job["status"] in TERMINAL_STATES:
+            return
+        self.store.set_status(job_id, "running")
+        self._notify(job_id)
+        runner = self.runners[job["kind"]]
+        try:
+            result = await self._loop.run_in_executor(
+                self._executor, runner, job["params"], lambda data: self._emit(job_id, data)
+            )
+            self.store.set_status(job_id, "succeeded", result=result)
+        except Exception as e:
+            print(f"Job {job_id} failed: {e}")
+            self.store.set_status(job_id, "failed", error=str(e))
+        self._notify(job_id)
@@ -0,0 +1,152 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from collections import defaultdict
+from typing import Optional
+from langchain_core._api import suppress_langchain_beta_warning
+from langchain_core.caches import BaseCache, RETURN_VAL_TYPE
+from langchain_core.load import dumps, loads
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, Generation
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Everything a cached chat model response deserializes to; anything else in the file is refused
+CACHED_OBJECTS = [ChatGeneration, ChatGenerationChunk, Generation, AIMessage, AIMessageChunk]
+
+# `loads` is marked beta and warns on its first call; make that call here, silenced,
+# so the first cache hit of a run doesn't print it
+with suppress_langchain_beta_warning():
+    loads("{}", allowed_objects=CACHED_OBJECTS)
+
+def prompt_label(prompt: str) -> str:
+    """
+    Short name for the system prompt of a serialized message list, used to group
+    hit-rate stats (e.g. the tuition agent vs the orchestrator).
+    """
+    try:
+        for message in json.loads(prompt):
+            if message.get("id", [""])[-1] == "SystemMessage":
+                content = message["kwargs"]["content"]
+                return content.strip().splitlines()[0][:80]
+    except (ValueError, KeyError, IndexError, TypeError, AttributeError):
+        pass
+    return "(no system prompt)"
+
+def _without_message_id(generation):
+    # The stored message keeps the id of the run that produced it. Served again to another
+    # thread or turn, add_messages would merge it with that earlier message, so drop the id
+    # and let the model assign a fresh one as it does for a live call
+    if isinstance(generation, ChatGeneration) and generation.message.id is not None:
+        return generation.model_copy(update={"message": generation.message.model_copy(update={"id": None})})
+    return generation
+
+class SQLiteLLMCache(BaseCache):
+    """
+    Exact-match cache of chat model responses, stored in SQLite.
+
+    LangChain looks entries up by the serialized message list (`prompt`) and the
+    model configuration (`llm_string`: model name, temperature and any bound tool
+    schemas), so a hit means the model would have been asked exactly the same thing.
+    Entries expire after `ttl` seconds and the least recently used ones are
+    evicted beyond `max_entries`.
+    """
+
+    def __init__(self, db_path: str, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._counts = defaultdict(lambda: {"hits": 0, "misses": 0})
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_responses (
+                key TEXT PRIMARY KEY,
+                label TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS llm_responses_accessed_at ON llm_responses (accessed_at)")
+        self._conn.commit()
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{llm_string}\n{prompt}".encode("utf-8")).hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        key = self._key(prompt, llm_string)
+        label = prompt_label(prompt)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM llm_responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and now - row[1] >= self.ttl:
+                self._conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                self._conn.commit()
+                row = None
+            if row is None:
+                self._counts[label]["misses"] += 1
+                return None
+            self._conn.execute("UPDATE llm_responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self._counts[label]["hits"] += 1
+        return [_without_message_id(loads(generation, allowed_objects=CACHED_OBJECTS)) for generation in json.loads(row[0])]
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        now = time.time()
+        response = json.dumps([dumps(generation) for generation in return_val])
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_responses (key, label, response, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (self._key(prompt, llm_string), prompt_label(prompt), response, now, now)
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+            if count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM llm_responses WHERE key IN "
+                    "(SELECT key FROM llm_responses ORDER BY accessed_at ASC LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+            self._conn.commit()
+
+    def clear(self, **kwargs) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_responses")
+            self._conn.commit()
+            self._counts.clear()
+
+    def stats(self) -> dict:
+        """Hit/miss counts and hit rate per system prompt since the process started."""
+        with self._lock:
+            return {
+                label: {**counts, "hit_rate": round(counts["hits"] / (counts["hits"] + counts["misses"]), 3)}
+                for label, counts in self._counts.items()
+            }
+
+_llm_cache = None
+_llm_cache_lock = threading.Lock()
+
+def get_llm_cache() -> Optional[SQLiteLLMCache]:
+    """
+    Returns the shared LLM response cache, or None when disabled with LLM_CACHE_TTL=0.
+    Configured through LLM_CACHE_PATH, LLM_CACHE_TTL (seconds) and LLM_CACHE_MAX_ENTRIES.
+    """
+    global _llm_cache
+    ttl = float(os.getenv("LLM_CACHE_TTL", "86400"))
+    if ttl <= 0:
+        return None
+    if _llm_cache is None:
+        with _llm_cache_lock:
+            if _llm_cache is None:
+                _llm_cache = SQLiteLLMCache(
+                    db_path=os.getenv("LLM_CACHE_PATH", "llm_cache.sqlite"),
+                    ttl=ttl,
+                    max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "20000"))
+                )
+    return _llm_cache
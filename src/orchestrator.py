@@ -1,19 +1,26 @@
-import os
+import re
 import sqlite3
 from typing import Annotated, List, TypedDict, Dict
 from langgraph.graph import StateGraph, START, END
 from langgraph.graph.message import add_messages
 from langgraph.checkpoint.sqlite import SqliteSaver
 from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
-from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
-from langchain_openai import ChatOpenAI
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, RemoveMessage, SystemMessage
+from langchain_core.runnables import RunnableLambda
+from langgraph.constants import TAG_NOSTREAM
+from pydantic import BaseModel, Field
 from src.agent import (
     get_agent, 
+    get_llm,
     SYSTEM_PROMPT as TUITION_PROMPT,
     SALARY_AGENT_PROMPT,
     TAX_AGENT_PROMPT,
     COST_OF_LIVING_AGENT_PROMPT
 )
+from src.fact_store import get_fact_store, make_key
+from src.research import research_request
+from src.history import split_history, keep_turns, max_turns, summary_request, SUMMARY_PROMPT
+from src.slots import parse_slots, slot_updates, mentions_unparsed_target, normalize_college, normalize_major, normalize_location
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -21,6 +28,8 @@ load_dotenv()
 # Define the state schema
 class OrchestratorState(TypedDict):
     messages: Annotated[List[BaseMessage], add_messages]
+    # Rolling summary of turns that were dropped from `messages`
+    summary: str
     
     # State flags to track calculation progress
     college_name: str
@@ -33,25 +42,13 @@ class OrchestratorState(TypedDict):
     living_costs_found: bool
 
 def get_model():
-    api_key = os.getenv("OPEN_ROUTER_API_KEY")
-    return ChatOpenAI(
-        model="google/gemini-2.5-flash",
-        temperature=0,
-        streaming=True,
-        api_key=api_key,
-        base_url="https://openrouter.ai/api/v1"
-    )
+    return get_llm(streaming=True)
 
-def orchestrator_node(state: OrchestratorState):
-    """
-    The orchestrator manages the step-by-step data collection journey.
-    """
-    model = get_model()
-    
+def _orchestrator_messages(state: OrchestratorState) -> list:
     # Extract current state for prompting
-    college = state.get('college_name', 'Not provided')
-    major = state.get('major', 'Not provided')
-    location = state.get('location', 'Not provided')
+    college = state.get('college_name') or 'Not provided'
+    major = state.get('major') or 'Not provided'
+    location = state.get('location') or 'Not provided'
     
     system_msg = SystemMessage(content=f"""You are the College ROI Orchestrator. 
     Your goal is to collect all necessary data for an expected ROI calculation.
@@ -83,34 +80,212 @@ def orchestrator_node(state: OrchestratorState):
     Otherwise, just converse with the user normally to ask for the missing information.
     """)
     
-    messages = [system_msg] + state["messages"]
-    response = model.invoke(messages)
-    
+    messages = [system_msg]
+    if state.get("summary"):
+        messages.append(SystemMessage(content=f"SUMMARY OF EARLIER CONVERSATION:\n{state['summary']}"))
+    return messages + state["messages"]
+
+def orchestrator_node(state: OrchestratorState):
+    """
+    The orchestrator manages the step-by-step data collection journey.
+    """
+    response = get_model().invoke(_orchestrator_messages(state))
+    return {"messages": [response]}
+
+async def aorchestrator_node(state: OrchestratorState):
+    """Async orchestrator step: awaits the model so the server's event loop stays free."""
+    response = await get_model().ainvoke(_orchestrator_messages(state))
     return {"messages": [response]}
 
+def _history_to_fold(state: OrchestratorState):
+    return split_history(state["messages"], keep_turns(), max_turns())[0]
+
+def _summarizer_messages(state: OrchestratorState, folded: list) -> list:
+    return [SystemMessage(content=SUMMARY_PROMPT), HumanMessage(content=summary_request(state.get("summary", ""), folded))]
+
+def _history_update(folded: list, response) -> dict:
+    # RemoveMessage drops the folded turns from the checkpointed thread, not just from the prompt
+    return {
+        "summary": response.content,
+        "messages": [RemoveMessage(id=m.id) for m in folded]
+    }
+
+def _summarizer():
+    # Internal bookkeeping call, kept out of the user's token stream
+    return get_llm().with_config(tags=[TAG_NOSTREAM])
+
+def manage_history_node(state: OrchestratorState):
+    """
+    Keeps the thread bounded: once it holds more than HISTORY_MAX_TURNS turns, all but
+    the last HISTORY_KEEP_TURNS are folded into `summary` and removed from `messages`.
+    College, major, location and the progress flags stay in their own state fields.
+    """
+    folded = _history_to_fold(state)
+    if not folded:
+        return {}
+    try:
+        return _history_update(folded, _summarizer().invoke(_summarizer_messages(state, folded)))
+    except Exception as e:
+        # Keep the full history rather than lose turns that were never summarized
+        print(f"History summarization failed: {e}")
+        return {}
+
+async def amanage_history_node(state: OrchestratorState):
+    folded = _history_to_fold(state)
+    if not folded:
+        return {}
+    try:
+        return _history_update(folded, await _summarizer().ainvoke(_summarizer_messages(state, folded)))
+    except Exception as e:
+        print(f"History summarization failed: {e}")
+        return {}
+
+class ExtractedSlots(BaseModel):
+    """Research targets mentioned in the user's message. Leave a field empty if it was not mentioned."""
+    college_name: str = Field(default="", description="Official name of the college the user plans to attend")
+    major: str = Field(default="", description="The user's planned major, or 'Undecided'")
+    location: str = Field(default="", description="Where the user plans to live after graduation, as 'City, ST'")
+
+SLOT_EXTRACTION_PROMPT = """Extract the research targets from the user's reply in a college ROI conversation:
+the college they plan to attend, their planned major, and the US city where they plan to live and work after graduation.
+Only fill in what the user actually said. Use the assistant's question to interpret short answers."""
+
+# Words suggesting a message carries a target even though the regexes found none
+TARGET_HINTS = re.compile(r"\b(college|university|school|major|study|studying|live|move|work|city|state|tuition|costs?|salary|salaries|tax|taxes|pay)\b", re.I)
+
+def _needs_llm_extraction(state: OrchestratorState, text: str, found: dict) -> bool:
+    # Regexes handle most messages; pay for an LLM call only for replies that
+    # plausibly answer one of our questions but didn't match any pattern, or
+    # matched only part of what they mention ("UT Austin for econ")
+    if found:
+        return mentions_unparsed_target(text, found)
+    if all(state.get(slot) for slot in ("college_name", "major", "location")):
+        return False
+    answering = any(isinstance(m, AIMessage) for m in state["messages"][:-1])
+    return answering or bool(TARGET_HINTS.search(text))
+
+def _slot_extractor():
+    # Small non-streaming call, kept out of the user's token stream
+    return get_llm().with_structured_output(ExtractedSlots, method="function_calling").with_config(tags=[TAG_NOSTREAM])
+
+def _slot_extraction_messages(state: OrchestratorState, text: str) -> list:
+    asked = next((m.content for m in reversed(state["messages"][:-1]) if isinstance(m, AIMessage)), "")
+    return [
+        SystemMessage(content=SLOT_EXTRACTION_PROMPT),
+        HumanMessage(content=f"Assistant asked: {asked[-1000:]}\nUser replied: {text}")
+    ]
+
+def _normalized_slots(result: ExtractedSlots) -> dict:
+    found = {
+        "college_name": normalize_college(result.college_name) if result.college_name else "",
+        "major": normalize_major(result.major) if result.major else "",
+        "location": normalize_location(result.location) if result.location else "",
+    }
+    return {slot: value for slot, value in found.items() if value}
+
+def _extract_slots_with_llm(state: OrchestratorState, text: str) -> dict:
+    return _normalized_slots(_slot_extractor().invoke(_slot_extraction_messages(state, text)))
+
+async def _aextract_slots_with_llm(state: OrchestratorState, text: str) -> dict:
+    return _normalized_slots(await _slot_extractor().ainvoke(_slot_extraction_messages(state, text)))
+
+def _latest_user_text(state: OrchestratorState):
+    last_message = state["messages"][-1] if state["messages"] else None
+    if not isinstance(last_message, HumanMessage) or not isinstance(last_message.content, str):
+        return None
+    return last_message.content
+
+def extract_slots_node(state: OrchestratorState):
+    """
+    Fills college_name, major and location from the newest user message, so the
+    router and the research agents work from explicit targets.
+    """
+    text = _latest_user_text(state)
+    if text is None:
+        return {}
+
+    found = parse_slots(text)
+    if _needs_llm_extraction(state, text, found):
+        try:
+            # Slots the regexes did read are kept as they are
+            found = {**_extract_slots_with_llm(state, text), **found}
+        except Exception as e:
+            print(f"Slot extraction failed: {e}")
+    return slot_updates(state, found)
+
+async def aextract_slots_node(state: OrchestratorState):
+    text = _latest_user_text(state)
+    if text is None:
+        return {}
+
+    found = parse_slots(text)
+    if _needs_llm_extraction(state, text, found):
+        try:
+            # Slots the regexes did read are kept as they are
+            found = {**await _aextract_slots_with_llm(state, text), **found}
+        except Exception as e:
+            print(f"Slot extraction failed: {e}")
+    return slot_updates(state, found)
+
 # Helper to run an agent and update state flags
 def create_agent_node(prompt: str, flag_to_update: str):
-    def agent_node(state: OrchestratorState):
-        agent = get_agent()
-        # Find the last actual user request or the orchestrator's synthesized instruction
-        last_message = next((m.content for m in reversed(state["messages"]) if isinstance(m, HumanMessage)), "")
-        
+    # "tuition_found" -> "tuition": the fact store topic this node researches
+    topic = flag_to_update[:-len("_found")]
+
+    def prepare(state: OrchestratorState):
+        """Returns (fact key, cached update or None, agent inputs)."""
         # Add context from state so the agent knows what to search for
         college = state.get('college_name', '')
         major = state.get('major', '')
         location = state.get('location', '')
+
+        # Another user may already have researched the same target recently
+        store = get_fact_store()
+        key = make_key(topic, college, major, location)
+        if store is not None and key is not None:
+            answer = store.get(key)
+            if answer is not None:
+                return key, {"messages": [AIMessage(content=answer)], flag_to_update: True}, None
+
+        # Prefer a precise request built from the targets; fall back to the last user message
+        request = research_request(topic, college, major, location)
+        if not request:
+            request = next((m.content for m in reversed(state["messages"]) if isinstance(m, HumanMessage)), "")
         
         context_prompt = f"{prompt}\n\nCURRENT TARGETS for this search:\n- College: {college}\n- Major: {major}\n- Location: {location}"
         
         # Inject the contextual prompt
-        inputs = {"messages": [SystemMessage(content=context_prompt), HumanMessage(content=last_message)]}
-        result = agent.invoke(inputs)
+        inputs = {"messages": [SystemMessage(content=context_prompt), HumanMessage(content=request)]}
+        return key, None, inputs
+
+    def finish(key, result):
+        answer = result["messages"][-1]
+
+        store = get_fact_store()
+        if store is not None and key is not None and answer.content:
+            store.put(key, answer.content)
         
         return {
-            "messages": [result["messages"][-1]],
+            "messages": [answer],
             flag_to_update: True
         }
-    return agent_node
+
+    def agent_node(state: OrchestratorState):
+        key, cached, inputs = prepare(state)
+        if cached is not None:
+            return cached
+        return finish(key, get_agent().invoke(inputs))
+
+    async def aagent_node(state: OrchestratorState):
+        # Awaiting the agent keeps the event loop free for other streams while
+        # the research (LLM calls and tool I/O) is in flight
+        key, cached, inputs = prepare(state)
+        if cached is not None:
+            return cached
+        return finish(key, await get_agent().ainvoke(inputs))
+
+    # The sync graph (CLI) runs agent_node; astream/ainvoke (API server) run aagent_node
+    return RunnableLambda(agent_node, afunc=aagent_node, name=f"{topic}_agent")
 
 # Define specific nodes
 tuition_node = create_agent_node(TUITION_PROMPT, "tuition_found")
@@ -118,42 +293,93 @@ salary_node = create_agent_node(SALARY_AGENT_PROMPT, "salary_found")
 tax_node = create_agent_node(TAX_AGENT_PROMPT, "taxes_found")
 cost_of_living_node = create_agent_node(COST_OF_LIVING_AGENT_PROMPT, "living_costs_found")
 
-def get_orchestrator_graph(db_path="checkpoints.sqlite"):
-    conn = sqlite3.connect(db_path, check_same_thread=False)
-    memory = SqliteSaver(conn)
-    
+# Research node responsible for each progress flag
+RESEARCH_NODES = {
+    "tuition_found": "tuition_agent",
+    "salary_found": "salary_agent",
+    "taxes_found": "tax_agent",
+    "living_costs_found": "cost_of_living_agent",
+}
+
+# Routing tags the orchestrator LLM may still emit when it has to infer targets from the conversation
+ROUTE_TAGS = {
+    "[ROUTE: TUITION]": "tuition_found",
+    "[ROUTE: SALARY]": "salary_found",
+    "[ROUTE: TAX]": "taxes_found",
+    "[ROUTE: COST_OF_LIVING]": "living_costs_found",
+}
+
+def pending_research(state: OrchestratorState) -> list:
+    """
+    Research nodes whose inputs are known but whose results are not, evaluated in code.
+    Tuition needs the college, salary the college and major, and taxes and living costs
+    only the location, so independent research can run side by side. An empty list means
+    the orchestrator has to talk to the user (ask for a missing target or summarize).
+    """
+    college = state.get("college_name")
+    location = state.get("location")
+    ready = {
+        "tuition_found": bool(college),
+        "salary_found": bool(college and state.get("major")),
+        "taxes_found": bool(location),
+        "living_costs_found": bool(location),
+    }
+    return [node for flag, node in RESEARCH_NODES.items() if ready[flag] and not state.get(flag)]
+
+def router_node(state: OrchestratorState):
+    # Join point for parallel research branches; routing happens on its outgoing edges
+    return {}
+
+def route_from_state(state: OrchestratorState):
+    # Every research node whose inputs are available runs in parallel without an
+    # LLM round-trip; the LLM only runs when we need to talk to the user
+    return pending_research(state) or "orchestrator"
+
+def route_orchestrator(state: OrchestratorState):
+    # Fallback for targets the state doesn't hold yet: honour the LLM's routing tag,
+    # unless it asks for research that is already done
+    last_message = state["messages"][-1].content
+    for tag, flag in ROUTE_TAGS.items():
+        if tag in last_message and not state.get(flag):
+            return RESEARCH_NODES[flag]
+    return END
+
+def build_orchestrator_workflow():
+    """
+    Builds the (uncompiled) orchestrator graph shared by the CLI, MCP and API servers.
+    LLM-backed nodes have sync and async implementations: `invoke`/`stream` use the
+    former, `ainvoke`/`astream` the latter, so one graph serves both.
+    """
     workflow = StateGraph(OrchestratorState)
     
-    workflow.add_node("orchestrator", orchestrator_node)
+    workflow.add_node("manage_history", RunnableLambda(manage_history_node, afunc=amanage_history_node))
+    workflow.add_node("extract_slots", RunnableLambda(extract_slots_node, afunc=aextract_slots_node))
+    workflow.add_node("router", router_node)
+    workflow.add_node("orchestrator", RunnableLambda(orchestrator_node, afunc=aorchestrator_node))
     workflow.add_node("tuition_agent", tuition_node)
     workflow.add_node("salary_agent", salary_node)
     workflow.add_node("tax_agent", tax_node)
     workflow.add_node("cost_of_living_agent", cost_of_living_node)
     
     # Define the flow
-    workflow.add_edge(START, "orchestrator")
-    
-    def route_orchestrator(state: OrchestratorState):
-        last_message = state["messages"][-1].content
-        if "[ROUTE: TUITION]" in last_message:
-            return "tuition_agent"
-        elif "[ROUTE: SALARY]" in last_message:
-            return "salary_agent"
-        elif "[ROUTE: TAX]" in last_message:
-            return "tax_agent"
-        elif "[ROUTE: COST_OF_LIVING]" in last_message:
-            return "cost_of_living_agent"
-        return END
-
+    workflow.add_edge(START, "manage_history")
+    workflow.add_edge("manage_history", "extract_slots")
+    workflow.add_edge("extract_slots", "router")
+    workflow.add_conditional_edges("router", route_from_state)
     workflow.add_conditional_edges("orchestrator", route_orchestrator)
     
-    # All agents route back to orchestrator to determine the next step
-    workflow.add_edge("tuition_agent", "orchestrator")
-    workflow.add_edge("salary_agent", "orchestrator")
-    workflow.add_edge("tax_agent", "orchestrator")
-    workflow.add_edge("cost_of_living_agent", "orchestrator")
+    # Agents dispatched together in one step fan back in to a single router run,
+    # which then dispatches whatever research their combined results unlocked
+    for node in RESEARCH_NODES.values():
+        workflow.add_edge(node, "router")
+    
+    return workflow
+
+def get_orchestrator_graph(db_path="checkpoints.sqlite"):
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    memory = SqliteSaver(conn)
     
-    return workflow.compile(checkpointer=memory)
+    return build_orchestrator_workflow().compile(checkpointer=memory)
 
 from contextlib import asynccontextmanager
 
@@ -167,36 +393,7 @@ async def get_async_orchestrator_graph(db_path="checkpoints.sqlite"):
     
     # Needs to be an async context manager to handle the DB connection cleanly
     async with AsyncSqliteSaver.from_conn_string(db_path) as memory:
-        workflow = StateGraph(OrchestratorState)
-        
-        workflow.add_node("orchestrator", orchestrator_node)
-        workflow.add_node("tuition_agent", tuition_node)
-        workflow.add_node("salary_agent", salary_node)
-        workflow.add_node("tax_agent", tax_node)
-        workflow.add_node("cost_of_living_agent", cost_of_living_node)
-        
-        workflow.add_edge(START, "orchestrator")
-        
-        def route_orchestrator(state: OrchestratorState):
-            last_message = state["messages"][-1].content
-            if "[ROUTE: TUITION]" in last_message:
-                return "tuition_agent"
-            elif "[ROUTE: SALARY]" in last_message:
-                return "salary_agent"
-            elif "[ROUTE: TAX]" in last_message:
-                return "tax_agent"
-            elif "[ROUTE: COST_OF_LIVING]" in last_message:
-                return "cost_of_living_agent"
-            return END
-
-        workflow.add_conditional_edges("orchestrator", route_orchestrator)
-        
-        workflow.add_edge("tuition_agent", "orchestrator")
-        workflow.add_edge("salary_agent", "orchestrator")
-        workflow.add_edge("tax_agent", "orchestrator")
-        workflow.add_edge("cost_of_living_agent", "orchestrator")
-        
-        yield workflow.compile(checkpointer=memory)
+        yield build_orchestrator_workflow().compile(checkpointer=memory)
 
 if __name__ == "__main__":
     # Test script in verification
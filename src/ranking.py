@@ -0,0 +1,154 @@
+import math
+import re
+from collections import Counter
+
+# Passages are built from whole lines up to roughly this many characters
+PASSAGE_CHARS = 600
+# Marks the places where lower-ranked passages were left out
+GAP_MARKER = "\n[...]\n"
+
+# Dollar amounts and percentages: the figures the research agents are after
+FIGURE_PATTERN = re.compile(r"\$\s?\d|\d\s?%")
+
+def _stem(token: str) -> str:
+    # Just enough plural folding for "fees"/"fee" and "taxes"/"tax" to match
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 4 and token.endswith("es") and token[-3] in "sxz":
+        return token[:-2]
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+def tokenize(text: str) -> list:
+    return [_stem(t) for t in re.findall(r"[a-z0-9]+", text.lower())]
+
+def split_passages(text: str, target_chars: int = PASSAGE_CHARS) -> list:
+    """Groups consecutive lines into passages of about `target_chars` characters."""
+    passages = []
+    current = []
+    size = 0
+    for line in text.split("\n"):
+        current.append(line)
+        size += len(line) + 1
+        if size >= target_chars:
+            passages.append("\n".join(current))
+            current = []
+            size = 0
+    if current:
+        passages.append("\n".join(current))
+    return passages
+
+def bm25_scores(passages: list, query: str, k1: float = 1.5, b: float = 0.75) -> list:
+    """Okapi BM25 score of every passage against the query terms."""
+    terms = set(tokenize(query))
+    docs = [Counter(tokenize(p)) for p in passages]
+    if not terms or not docs:
+        return [0.0] * len(passages)
+
+    avg_len = sum(sum(d.values()) for d in docs) / len(docs) or 1.0
+    doc_freq = {t: sum(1 for d in docs if t in d) for t in terms}
+
+    scores = []
+    for passage, doc in zip(passages, docs):
+        length = sum(doc.values())
+        score = 0.0
+        for term in terms:
+            tf = doc.get(term, 0)
+            if not tf:
+                continue
+            idf = math.log(1 + (len(docs) - doc_freq[term] + 0.5) / (doc_freq[term] + 0.5))
+            score += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * length / avg_len))
+        # Among relevant passages, prefer the ones that actually contain numbers
+        if score and FIGURE_PATTERN.search(passage):
+            score *= 1.25
+        scores.append(score)
+    return scores
+
+def select_passages(text: str, query: str, budget: int) -> str:
+    """
+    Returns at most `budget` characters of `text`, keeping the passages that best
+    match `query` in their original order. The opening passage is always kept
+    since it usually names the page. Without a query, or when nothing matches,
+    this is plain truncation.
+    """
+    if len(text) <= budget:
+        return text
+    passages = split_passages(text)
+    scores = bm25_scores(passages, query)
+    if not any(scores):
+        return text[:budget]
+
+    chosen = {0}
+    used = len(passages[0])
+    ranked = sorted(range(1, len(passages)), key=lambda i: scores[i], reverse=True)
+    for i in ranked:
+        if scores[i] <= 0:
+            break
+        cost = len(passages[i]) + len(GAP_MARKER)
+        if used + cost > budget:
+            continue
+        chosen.add(i)
+        used += cost
+
+    parts = []
+    previous = -1
+    for i in sorted(chosen):
+        if parts and i != previous + 1:
+            parts.append(GAP_MARKER)
+        elif parts:
+            parts.append("\n")
+        parts.append(passages[i])
+        previous = i
+    return "".join(parts)[:budget]
+
+def select_across_documents(documents: list, query: str, budget: int) -> str:
+    """
+    Combines several (source, text) pages into one observation of at most `budget`
+    characters. Passages are ranked against `query` across all pages together, so
+    a page with nothing relevant costs almost nothing. Sources are listed best-first.
+    """
+    if not documents:
+        return ""
+    passages = []
+    for doc_index, (_, text) in enumerate(documents):
+        for position, passage in enumerate(split_passages(text)):
+            passages.append((doc_index, position, passage))
+    scores = bm25_scores([p[2] for p in passages], query)
+
+    if not any(scores):
+        # Nothing to rank by: give every page an equal share
+        share = budget // len(documents)
+        return "\n\n".join(f"SOURCE: {source}\n{text[:share]}" for source, text in documents)[:budget]
+
+    # Every page keeps its heading line so the agent knows what it is looking at
+    chosen = {(d, 0) for d in range(len(documents))}
+    used = sum(len(f"SOURCE: {source}\n\n") for source, _ in documents)
+    used += sum(len(p[2]) for p in passages if p[1] == 0)
+    for i in sorted(range(len(passages)), key=lambda i: scores[i], reverse=True):
+        doc_index, position, passage = passages[i]
+        if scores[i] <= 0:
+            break
+        cost = len(passage) + len(GAP_MARKER)
+        if (doc_index, position) in chosen or used + cost > budget:
+            continue
+        chosen.add((doc_index, position))
+        used += cost
+
+    best = [0.0] * len(documents)
+    for (doc_index, _, _), score in zip(passages, scores):
+        best[doc_index] = max(best[doc_index], score)
+
+    sections = []
+    for doc_index in sorted(range(len(documents)), key=lambda d: best[d], reverse=True):
+        parts = []
+        previous = -1
+        for d, position, passage in passages:
+            if d != doc_index or (d, position) not in chosen:
+                continue
+            if parts:
+                parts.append(GAP_MARKER if position != previous + 1 else "\n")
+            parts.append(passage)
+            previous = position
+        sections.append(f"SOURCE: {documents[doc_index][0]}\n" + "".join(parts))
+    return "\n\n".join(sections)[:budget]
@@ -0,0 +1,127 @@
+import os
+import time
+import asyncio
+import threading
+from dotenv import load_dotenv
+
+load_dotenv()
+
+class RateLimitExceeded(Exception):
+    """Raised when a request would have to queue longer than the limiter's `max_wait`."""
+
+class _Bucket:
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        # Counters reported by HostRateLimiter.stats()
+        self.queued = 0
+        self.requests = 0
+        self.delayed = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+class HostRateLimiter:
+    """
+    Token-bucket scheduler keyed by host, shared by every outbound research request.
+
+    Each host refills `rate` tokens per second up to `burst`. A request that finds
+    the bucket empty reserves a future token and sleeps until it is due, so bursts
+    are smoothed into a steady stream instead of tripping upstream throttling.
+    Requests that would wait longer than `max_wait` seconds fail fast instead.
+    """
+
+    def __init__(self, rate: float, burst: float, max_wait: float, overrides: dict = None):
+        self.rate = rate
+        self.burst = burst
+        self.max_wait = max_wait
+        self.overrides = overrides or {}
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, host: str) -> _Bucket:
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            rate, burst = self.overrides.get(host, (self.rate, self.burst))
+            bucket = self._buckets[host] = _Bucket(rate, burst)
+        return bucket
+
+    def _reserve(self, host: str) -> float:
+        """Takes a token for `host` and returns how long the caller must wait before using it."""
+        with self._lock:
+            bucket = self._bucket(host)
+            now = time.monotonic()
+            bucket.tokens = min(bucket.burst, bucket.tokens + (now - bucket.updated) * bucket.rate)
+            bucket.updated = now
+
+            wait = 0.0 if bucket.tokens >= 1 else (1 - bucket.tokens) / bucket.rate
+            if wait > self.max_wait:
+                bucket.rejected += 1
+                raise RateLimitExceeded(f"too many requests to {host}, try again in {wait:.0f}s")
+
+            bucket.tokens -= 1
+            bucket.requests += 1
+            if wait:
+                bucket.queued += 1
+                bucket.delayed += 1
+                bucket.total_wait += wait
+                bucket.max_wait = max(bucket.max_wait, wait)
+            return wait
+
+    def _release(self, host: str, wait: float):
+        if wait:
+            with self._lock:
+                self._buckets[host].queued -= 1
+
+    def acquire(self, host: str):
+        """Blocks until a request to `host` is allowed."""
+        wait = self._reserve(host)
+        try:
+            if wait:
+                time.sleep(wait)
+        finally:
+            self._release(host, wait)
+
+    async def aacquire(self, host: str):
+        """Waits, without blocking the event loop, until a request to `host` is allowed."""
+        wait = self._reserve(host)
+        try:
+            if wait:
+                await asyncio.sleep(wait)
+        finally:
+            self._release(host, wait)
+
+    def penalize(self, host: str, seconds: float):
+        """Holds back new requests to `host`, e.g. after a 429 with Retry-After."""
+        with self._lock:
+            bucket = self._bucket(host)
+            bucket.tokens = min(bucket.tokens, 1 - seconds * bucket.rate)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                host: {
+                    "queued": b.queued,
+                    "requests": b.requests,
+                    "delayed": b.delayed,
+                    "rejected": b.rejected,
+                    "avg_wait_s": round(b.total_wait / b.delayed, 3) if b.delayed else 0.0,
+                    "max_wait_s": round(b.max_wait, 3)
+                }
+                for host, b in self._buckets.items()
+            }
+
+# DuckDuckGo's HTML endpoint throttles far sooner than college sites do
+rate_limiter = HostRateLimiter(
+    rate=float(os.getenv("RATE_LIMIT_RPS", "2")),
+    burst=float(os.getenv("RATE_LIMIT_BURST", "4")),
+    max_wait=float(os.getenv("RATE_LIMIT_MAX_WAIT", "15")),
+    overrides={
+        "html.duckduckgo.com": (
+            float(os.getenv("RATE_LIMIT_SEARCH_RPS", "1")),
+            float(os.getenv("RATE_LIMIT_SEARCH_BURST", "3"))
+        )
+    }
+)
@@ -0,0 +1,144 @@
+import os
+import asyncio
+from typing import List
+from pydantic import BaseModel, field_validator
+from langchain_core.messages import HumanMessage, SystemMessage
+from src.agent import get_agent, SYSTEM_PROMPT, SALARY_AGENT_PROMPT, TAX_AGENT_PROMPT, COST_OF_LIVING_AGENT_PROMPT
+from src.fact_store import get_fact_store, make_key
+from src.singleflight import research_flights, flight_key
+from src.slots import normalize_location
+
+TOPIC_PROMPTS = {
+    "tuition": SYSTEM_PROMPT,
+    "salary": SALARY_AGENT_PROMPT,
+    "taxes": TAX_AGENT_PROMPT,
+    "living_costs": COST_OF_LIVING_AGENT_PROMPT,
+}
+
+def research_request(topic: str, college: str, major: str, location: str) -> str:
+    """Precise instruction for a research agent, built from the extracted targets."""
+    if topic == "tuition" and college:
+        return f"Find the per-year tuition cost for {college}"
+    if topic == "salary" and college:
+        request = f"Find the average expected starting salary for graduates of {college}"
+        if major and major != "Undecided":
+            request += f" majoring in {major}"
+        return request
+    if topic == "taxes" and location:
+        return f"Find the state and local income tax rates for someone living and working in {location}"
+    if topic == "living_costs" and location:
+        return f"Find the low, median, and high estimates for monthly rent, groceries, utilities, transportation, and healthcare in {location}"
+    return ""
+
+async def research_topic(topic: str, college_name: str = "", major: str = "", location: str = "") -> str:
+    """
+    Researched answer for one topic: from the fact store when fresh, otherwise from
+    an agent run shared with any identical run already in flight.
+    """
+    request = research_request(topic, college_name, major, location)
+    if not request:
+        raise ValueError(f"not enough information to research {topic}")
+
+    store = get_fact_store()
+    key = make_key(topic, college_name, major, location)
+    if store is not None and key is not None:
+        answer = store.get(key)
+        if answer is not None:
+            return answer
+
+    async def run():
+        inputs = {"messages": [SystemMessage(content=TOPIC_PROMPTS[topic]), HumanMessage(content=request)]}
+        result = await get_agent().ainvoke(inputs)
+        answer = result["messages"][-1].content
+        if store is not None and key is not None and answer:
+            store.put(key, answer)
+        return answer
+
+    return await research_flights.do(tuple(key) if key else flight_key(topic, request), run)
+
+class CollegeTarget(BaseModel):
+    college_name: str
+    major: str = ""
+    location: str = ""
+
+    @field_validator("location")
+    @classmethod
+    def _normalize_location(cls, location: str) -> str:
+        # "Austin, Texas" and "austin, tx" must share one fact key, and so one research run
+        return normalize_location(location) if location.strip() else ""
+
+def compare_parallelism(requested: int = None) -> int:
+    """Concurrent research runs per comparison: the requested value (or COMPARE_PARALLELISM), capped at COMPARE_MAX_PARALLELISM."""
+    default = int(os.getenv("COMPARE_PARALLELISM", "4"))
+    return max(1, min(requested or default, int(os.getenv("COMPARE_MAX_PARALLELISM", "8"))))
+
+def compare_max_colleges() -> int:
+    return int(os.getenv("COMPARE_MAX_COLLEGES", "40"))
+
+def compare_size_error(colleges: list) -> str:
+    """Why a comparison of `colleges` cannot run, or "" when its size is acceptable."""
+    if not colleges:
+        return "colleges must not be empty"
+    if len(colleges) > compare_max_colleges():
+        return f"At most {compare_max_colleges()} colleges can be compared at once"
+    return ""
+
+def topics_for(target: CollegeTarget) -> List[str]:
+    topics = ["tuition", "salary"]
+    if target.location:
+        topics += ["taxes", "living_costs"]
+    return topics
+
+class BatchComparison:
+    """
+    Researches tuition and salary for every college, and taxes and living costs for
+    every post-graduation city, running at most `parallelism` agent runs at a time.
+
+    Sub-queries are deduplicated on their fact key before anything runs, so ten
+    colleges compared for the same city trigger one tax run and one cost of living run.
+    Results are yielded per college as soon as all of its sub-queries are done.
+    """
+
+    def __init__(self, colleges: List[CollegeTarget], parallelism: int):
+        self.colleges = colleges
+        self._semaphore = asyncio.Semaphore(parallelism)
+        self._subqueries = {}
+        self.requested = 0
+
+    async def _limited(self, topic: str, target: CollegeTarget) -> str:
+        async with self._semaphore:
+            return await research_topic(topic, target.college_name, target.major, target.location)
+
+    def _subquery(self, topic: str, target: CollegeTarget) -> asyncio.Task:
+        self.requested += 1
+        key = make_key(topic, target.college_name, target.major, target.location) or (topic, id(target))
+        task = self._subqueries.get(key)
+        if task is None:
+            task = self._subqueries[key] = asyncio.ensure_future(self._limited(topic, target))
+        return task
+
+    async def _college(self, index: int, target: CollegeTarget, tasks: dict) -> dict:
+        result = {"index": index, **target.model_dump(), "errors": {}}
+        for topic, task in tasks.items():
+            try:
+                # Shared with other colleges: waiting here must not cancel it for them
+                result[topic] = await asyncio.shield(task)
+            except Exception as e:
+                result["errors"][topic] = str(e)
+        return result
+
+    async def results(self):
+        colleges = [
+            asyncio.ensure_future(self._college(i, target, {topic: self._subquery(topic, target) for topic in topics_for(target)}))
+            for i, target in enumerate(self.colleges)
+        ]
+        try:
+            for next_done in asyncio.as_completed(colleges):
+                yield await next_done
+        finally:
+            # The caller stopped early (e.g. the client disconnected): stop queued work
+            for task in colleges + list(self._subqueries.values()):
+                task.cancel()
+
+    def stats(self) -> dict:
+        return {"colleges": len(self.colleges), "subqueries": self.requested, "unique_subqueries": len(self._subqueries)}
@@ -0,0 +1,65 @@
+import asyncio
+import threading
+import weakref
+from collections import defaultdict
+from typing import Awaitable, Callable
+from src.fact_store import canonical
+
+def flight_key(topic: str, *args: str) -> tuple:
+    """Key under which identical research requests are coalesced, e.g. ("tuition", "stanford university")."""
+    return (topic,) + tuple(canonical(a) for a in args)
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls: the first caller for a key starts the work,
+    and callers arriving while it is in flight await the same result (or exception)
+    instead of starting their own run. Nothing is cached once the call completes.
+
+    Calls are tracked per event loop, since an asyncio task can only be awaited
+    from the loop it runs on.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = weakref.WeakKeyDictionary()
+        self._counts = defaultdict(lambda: {"executions": 0, "coalesced": 0})
+
+    def _count(self, key: tuple, field: str):
+        with self._lock:
+            self._counts[key[0]][field] += 1
+
+    async def do(self, key: tuple, fn: Callable[[], Awaitable]):
+        loop = asyncio.get_running_loop()
+        calls = self._calls.setdefault(loop, {})
+        task = calls.get(key)
+        if task is not None:
+            self._count(key, "coalesced")
+        else:
+            self._count(key, "executions")
+            task = loop.create_task(fn())
+            calls[key] = task
+
+            def forget(done):
+                if calls.get(key) is done:
+                    del calls[key]
+                # Mark the outcome as retrieved even if every waiter went away
+                if not done.cancelled():
+                    done.exception()
+            task.add_done_callback(forget)
+        # A caller that disconnects must not cancel the run the others are waiting on
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        """Runs started and duplicate requests absorbed, per topic, plus calls currently in flight."""
+        with self._lock:
+            in_flight = sum(len(calls) for calls in list(self._calls.values()))
+            return {
+                "in_flight": in_flight,
+                "topics": {
+                    topic: {**counts, "suppressed": round(counts["coalesced"] / (counts["executions"] + counts["coalesced"]), 3)}
+                    for topic, counts in self._counts.items()
+                }
+            }
+
+# Shared by the API and MCP research endpoints
+research_flights = SingleFlight()
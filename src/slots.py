@@ -0,0 +1,247 @@
+import re
+from src.fact_store import canonical
+
+US_STATES = {
+    "alabama": "AL", "alaska": "AK", "arizona": "AZ", "arkansas": "AR", "california": "CA",
+    "colorado": "CO", "connecticut": "CT", "delaware": "DE", "florida": "FL", "georgia": "GA",
+    "hawaii": "HI", "idaho": "ID", "illinois": "IL", "indiana": "IN", "iowa": "IA",
+    "kansas": "KS", "kentucky": "KY", "louisiana": "LA", "maine": "ME", "maryland": "MD",
+    "massachusetts": "MA", "michigan": "MI", "minnesota": "MN", "mississippi": "MS", "missouri": "MO",
+    "montana": "MT", "nebraska": "NE", "nevada": "NV", "new hampshire": "NH", "new jersey": "NJ",
+    "new mexico": "NM", "new york": "NY", "north carolina": "NC", "north dakota": "ND", "ohio": "OH",
+    "oklahoma": "OK", "oregon": "OR", "pennsylvania": "PA", "rhode island": "RI", "south carolina": "SC",
+    "south dakota": "SD", "tennessee": "TN", "texas": "TX", "utah": "UT", "vermont": "VT",
+    "virginia": "VA", "washington": "WA", "west virginia": "WV", "wisconsin": "WI", "wyoming": "WY",
+    "district of columbia": "DC",
+}
+STATE_CODES = frozenset(US_STATES.values())
+
+# Common short names users type instead of the official college name
+COLLEGE_ALIASES = {
+    "mit": "Massachusetts Institute of Technology",
+    "caltech": "California Institute of Technology",
+    "cmu": "Carnegie Mellon University",
+    "nyu": "New York University",
+    "ucla": "University of California, Los Angeles",
+    "uc berkeley": "University of California, Berkeley",
+    "usc": "University of Southern California",
+    "upenn": "University of Pennsylvania",
+    "umich": "University of Michigan",
+    "uiuc": "University of Illinois Urbana-Champaign",
+    "ut austin": "University of Texas at Austin",
+    "georgia tech": "Georgia Institute of Technology",
+    "virginia tech": "Virginia Polytechnic Institute and State University",
+}
+
+MAJOR_ALIASES = {
+    "cs": "Computer Science",
+    "comp sci": "Computer Science",
+    "econ": "Economics",
+    "ee": "Electrical Engineering",
+    "ece": "Electrical and Computer Engineering",
+    "me": "Mechanical Engineering",
+    "mech e": "Mechanical Engineering",
+    "bio": "Biology",
+    "psych": "Psychology",
+    "poli sci": "Political Science",
+}
+
+_WORD = r"[A-Z][\w&'.-]*"
+# "in"/"for" would swallow a capitalised major: "University of Michigan for Economics"
+_CONNECTOR = r"(?:of|at|and|the|&)"
+# Inside a "<Name> University" prefix "at" would swallow it too: "Economics at Rice University"
+_NAME_CONNECTOR = r"(?:of|and|the|&)"
+# Words that belong in front of "University of ...": "State University of New York at Buffalo"
+_QUALIFIER = r"(?:State|City|Catholic|Medical|Technical|Polytechnic|National|American)"
+COLLEGE_PATTERNS = [
+    # "University of California, Berkeley", "College of William & Mary"
+    re.compile(rf"\b((?:{_QUALIFIER}\s+)?(?:University|College|Institute) of {_WORD}(?:(?:,\s*|\s+)(?:{_CONNECTOR}\s+)?{_WORD})*)"),
+    # "Stanford University", "Boston College", "Massachusetts Institute of Technology"
+    re.compile(rf"\b((?:(?!University\b|College\b){_WORD}\s+(?:{_NAME_CONNECTOR}\s+)?){{1,4}}(?:University|College|Institute of Technology|Polytechnic Institute))\b"),
+]
+
+_STATE_NAMES = "|".join(sorted((name.title() for name in US_STATES), key=len, reverse=True))
+LOCATION_PATTERN = re.compile(rf"\b((?:[A-Z][a-zA-Z.'-]+\s){{0,3}}[A-Z][a-zA-Z.'-]+),\s*({_STATE_NAMES}|[A-Z]{{2}})\b")
+# Only treat a "City, ST" as the post-graduation location when the user talks about living or
+# working there later; "I live in Portland, OR now" is where they live today
+LOCATION_CUES = re.compile(
+    r"\b(move|moving|relocat\w*|settle|job|after (?:i )?(?:graduat\w*|college|school)|post[- ]grad\w*|"
+    r"(?:will|'ll|plan(?:ning)? to|want to|hope to|going to|like to|intend to|would) (?:live|work))\b", re.I
+)
+CURRENT_RESIDENCE = re.compile(r"\b(live|living|currently|now|from|grew up|home(?:town)?)\b", re.I)
+
+MAJOR_PATTERNS = [
+    re.compile(r"\bmajor\s+(?:is|will be|would be|is going to be)\s+([a-z][a-z &-]+)", re.I),
+    re.compile(r"\bmajor(?:ing)?\s+in\s+([a-z][a-z &-]+)", re.I),
+    re.compile(r"\b(?:study|studying|degree in)\s+([a-z][a-z &-]+)", re.I),
+    # At most three words, not from inside a contraction ("I'm a CS major" must not capture
+    # "m a CS"), and only where "major" ends the phrase, not in "a major expense"
+    re.compile(
+        r"\b(?<!['’])([a-z][a-z&-]*(?:\s+[a-z&][a-z&-]*){0,2})\s+major"
+        r"(?=\s*$|\s*[.,;:!?)]|\s+(?:at|in|from|and|but|so|or|with|because|then|who)\b)", re.I
+    ),
+]
+# Stems of words found in majors. A capture without one ("study hard", "a double major") is
+# more likely everyday speech, so the message goes to the LLM extractor instead
+MAJOR_WORDS = re.compile(
+    r"\b(?:scien|engineer|comput|data|informat|cyber|software|math|statist|physic|chemi|biolog|biochem|"
+    r"bioengineer|biomedic|neuro|genetic|ecolog|environment|geolog|geograph|astronom|marine|zoolog|agricult|"
+    r"nutrition|kinesiolog|nurs|pre-?med|pre-?law|medic|health|pharm|dental|therap|veterinar|psycholog|"
+    r"sociolog|anthropolog|econ|financ|account|business|marketing|management|entrepreneur|supply chain|"
+    r"hospitality|real estate|polit|government|international|public policy|law|criminal|justice|social work|"
+    r"histor|philosoph|religio|classics|english|literat|linguist|languages?|spanish|french|german|chinese|"
+    r"japanese|arabic|russian|italian|writing|journalism|communication|media|film|theat|music|danc|art|"
+    r"design|architect|animation|photograph|education|teaching|studies|urban|planning|aerospace|aeronaut|"
+    r"mechanic|electric|civil|industrial|material|nuclear|petroleum|chemical|liberal)", re.I
+)
+UNDECIDED_PATTERN = re.compile(r"\b(undecided|undeclared|not sure (?:yet|what|about (?:my|the) major)|haven'?t decided)\b", re.I)
+# Words that end a major phrase: "computer science at Stanford", "economics and then work in Austin"
+MAJOR_STOP = re.compile(r"(?:^|\s+)(?:at|in|from|and then|then|after|because|but|so|or|while|when)\b.*$", re.I)
+MAJOR_FILLER = re.compile(r"^(?:a|an|the|my|to|be|going|planning|plan|want|i'm|im|i|will|probably|maybe)(?:\s+|$)", re.I)
+# A capture starting with one of these is not a major: "study at Harvard", "major in what pays best"
+MAJOR_REJECT = re.compile(r"^(?:at|in|on|to|for|from|with|and|or|my|your|his|her|their|our|me|it|this|that|what|which|whatever|where|who|how|why)\b", re.I)
+# "CS", "ME": all-caps acronyms go through MAJOR_ALIASES and are never read as pronouns
+ACRONYM = re.compile(r"^[A-Z]{2,4}$")
+
+# Capitalised words that start a sentence rather than a college name ("Maybe Boston College")
+LEADING_FILLER = re.compile(r"^(?:(?:I|I'm|Maybe|Probably|Perhaps|Find|Tell|What|How|Is|About|Hi|Hello|Yes|No|Ok|Okay|Please|So|And|But|My|Thinking|Considering)\s+)+")
+
+def normalize_college(name: str) -> str:
+    name = LEADING_FILLER.sub("", re.sub(r"\s+", " ", name)).strip(" .,;:!?")
+    alias = COLLEGE_ALIASES.get(name.lower())
+    if alias:
+        return alias
+    # Keep the user's capitalisation but make connector words consistent
+    return re.sub(r"(?<!^)\b(Of|At|And|The|In|For)\b", lambda m: m.group(1).lower(), name)
+
+def normalize_major(major: str) -> str:
+    """Returns "" when the phrase is not a usable major."""
+    major = major.strip(" .,;:!?")
+    if ACRONYM.match(major):
+        return MAJOR_ALIASES.get(major.lower(), major)
+    major = MAJOR_STOP.sub("", major)
+    while MAJOR_FILLER.match(major):
+        major = MAJOR_FILLER.sub("", major)
+    major = major.strip(" .,;:!?")
+    if not major:
+        return ""
+    if ACRONYM.match(major):
+        return MAJOR_ALIASES.get(major.lower(), major)
+    if MAJOR_REJECT.match(major):
+        return ""
+    alias = MAJOR_ALIASES.get(major.lower())
+    if alias:
+        return alias
+    return " ".join(w if w.lower() in ("and", "of", "&") else w.capitalize() for w in major.split())
+
+def normalize_location(location: str) -> str:
+    """"austin, texas" / "Austin,TX" -> "Austin, TX"."""
+    city, _, state = location.rpartition(",")
+    if not city:
+        return location.strip()
+    state = state.strip()
+    code = US_STATES.get(state.lower(), state.upper())
+    city = " ".join(w.capitalize() for w in city.split())
+    return f"{city}, {code}"
+
+def find_college(text: str) -> str:
+    for alias in sorted(COLLEGE_ALIASES, key=len, reverse=True):
+        if re.search(rf"\b{re.escape(alias)}\b", text, re.I):
+            return COLLEGE_ALIASES[alias]
+    # "Massachusetts Institute of Technology" also contains a match for "Institute of Technology": keep the longest
+    candidates = [normalize_college(m.group(1)) for pattern in COLLEGE_PATTERNS for m in pattern.finditer(text)]
+    return max(candidates, key=len, default="")
+
+def is_known_major(major: str) -> bool:
+    return major in MAJOR_ALIASES.values() or bool(MAJOR_WORDS.search(major))
+
+def find_major(text: str):
+    """
+    The major mentioned in text, "" if none was mentioned, or None if a major
+    phrase matched but could not be read ("I plan to study at Harvard") or does
+    not look like a major ("I plan to study hard").
+    """
+    if UNDECIDED_PATTERN.search(text):
+        return "Undecided"
+    rejected = False
+    for pattern in MAJOR_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            major = normalize_major(match.group(1))
+            if major and is_known_major(major):
+                return major
+            rejected = True
+    return None if rejected else ""
+
+def find_location(text: str) -> str:
+    for match in LOCATION_PATTERN.finditer(text):
+        state = match.group(2)
+        if state.upper() not in STATE_CODES and state.lower() not in US_STATES:
+            continue
+        if LOCATION_CUES.search(text):
+            return normalize_location(f"{match.group(1)}, {state}")
+        # "Ann Arbor, MI" on its own is an answer to "where will you live?"; "I live in Ann Arbor, MI" is not
+        if len(text.strip()) <= len(match.group(0)) + 15 and not CURRENT_RESIDENCE.search(text):
+            return normalize_location(f"{match.group(1)}, {state}")
+    return ""
+
+def parse_slots(text: str) -> dict:
+    """
+    Cheap, regex-based extraction of college_name, major and location from one
+    user message. Only slots that were found are returned, already normalized.
+    If a major phrase matched but could not be read, nothing is returned so the
+    caller falls back to the LLM extractor for the whole message.
+    """
+    found = {
+        "college_name": find_college(text),
+        "major": find_major(text),
+        "location": find_location(text),
+    }
+    if found["major"] is None:
+        return {}
+    return {slot: value for slot, value in found.items() if value}
+
+# Short aliases that are also English words ("me") only count when typed as acronyms
+_MAJOR_ALIAS_HINT = re.compile(
+    "|".join(rf"\b{re.escape(alias)}\b" if len(alias) > 2 else rf"\b{alias.upper()}\b" for alias in MAJOR_ALIASES)
+)
+COLLEGE_HINT = re.compile(r"(?<!after )\b(?:college|university|school|attend\w*|admitted|accepted)\b", re.I)
+
+def mentions_unparsed_target(text: str, found: dict) -> bool:
+    """
+    Whether the message seems to name a target that parse_slots did not return,
+    e.g. the major in "UT Austin for econ" or a location without a cue about living
+    there later. The caller then asks the LLM extractor about the whole message.
+    """
+    rest = text
+    for alias in COLLEGE_ALIASES:
+        rest = re.sub(rf"\b{re.escape(alias)}\b", " ", rest, flags=re.I)
+    for pattern in COLLEGE_PATTERNS:
+        rest = pattern.sub(" ", rest)
+    if "major" not in found and (MAJOR_WORDS.search(rest) or _MAJOR_ALIAS_HINT.search(rest)):
+        return True
+    if "location" not in found and (LOCATION_PATTERN.search(rest) or LOCATION_CUES.search(rest)):
+        return True
+    return "college_name" not in found and bool(COLLEGE_HINT.search(rest))
+
+# Progress flags that become stale when a slot changes
+DEPENDENT_FLAGS = {
+    "college_name": ("tuition_found", "salary_found"),
+    "major": ("salary_found",),
+    "location": ("taxes_found", "living_costs_found"),
+}
+
+def slot_updates(state: dict, found: dict) -> dict:
+    """
+    State update for newly found slots. Changing a slot (e.g. switching college)
+    clears the flags of research that depended on the old value; repeating the
+    same value in different words changes nothing.
+    """
+    update = {}
+    for slot, value in found.items():
+        if not value or canonical(value) == canonical(state.get(slot, "")):
+            continue
+        update[slot] = value
+        for flag in DEPENDENT_FLAGS[slot]:
+            update[flag] = False
+    return update
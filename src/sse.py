@@ -0,0 +1,88 @@
+import os
+import json
+import uuid
+from langchain_core.messages import BaseMessage, RemoveMessage
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the standard library encoder
+    orjson = None
+
+def fast_json_enabled() -> bool:
+    """Whether SSE payloads are encoded with orjson, from SSE_FAST_JSON (on when orjson is installed)."""
+    return orjson is not None and os.getenv("SSE_FAST_JSON", "true").lower() in ("1", "true", "yes")
+
+def dumps(data, fast: bool = None) -> str:
+    if fast is None:
+        fast = fast_json_enabled()
+    if fast:
+        return orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    return json.dumps(data, default=str)
+
+def format_sse(event: str, data, fast: bool = None) -> str:
+    """One Server-Sent Event frame."""
+    return f"event: {event}\ndata: {dumps(data, fast)}\n\n"
+
+def serialize_message(message) -> dict:
+    """JSON form of a (possibly partial) LangChain message, including tool calls and tool results."""
+    if isinstance(message, RemoveMessage):
+        return {"type": "remove", "id": message.id}
+    data = {
+        "content": message.content,
+        "id": getattr(message, "id", None) or str(uuid.uuid4()),
+        "type": getattr(message, "type", "ai"),
+        "response_metadata": getattr(message, "response_metadata", {})
+    }
+    for field in ("name", "tool_calls", "tool_call_chunks", "tool_call_id"):
+        value = getattr(message, field, None)
+        if value:
+            data[field] = value
+    return data
+
+def serialize_values(state: dict) -> dict:
+    """Full thread state: every state key plus the whole message list."""
+    state_copy = {k: v for k, v in state.items() if k != "messages"}
+    return {**state_copy, "messages": [serialize_message(m) for m in state.get("messages", [])]}
+
+def serialize_update(update: dict) -> dict:
+    """
+    What each node changed in one step: only the keys it wrote and the messages it
+    added ({"type": "remove"} entries for messages it dropped). Nodes that changed
+    nothing are left out.
+    """
+    delta = {}
+    for node, output in update.items():
+        if not output or not isinstance(output, dict):
+            continue
+        changes = {}
+        for key, value in output.items():
+            if key == "messages":
+                messages = value if isinstance(value, list) else [value]
+                changes["messages"] = [serialize_message(m) for m in messages if isinstance(m, BaseMessage)]
+            else:
+                changes[key] = value
+        delta[node] = changes
+    return delta
+
+def format_chunk(namespace: tuple, chunk_type: str, chunk_data, fast: bool = None):
+    """
+    SSE frame for one `astream(..., subgraphs=True)` chunk, or None when the chunk
+    is not forwarded. `values` and `updates` are only sent for the top-level graph;
+    sub-agent progress reaches clients through `messages-tuple`.
+    """
+    # For messages-tuple, the React Hook expects raw message metadata and the message object
+    if chunk_type == "messages":
+        message_obj, metadata = chunk_data
+        metadata = dict(metadata)
+        if namespace:
+            # ("tuition_agent:<task id>", ...) -> "tuition_agent"
+            metadata["parent_node"] = namespace[0].split(":")[0]
+        return format_sse("messages-tuple", [serialize_message(message_obj), metadata], fast)
+    if namespace:
+        return None
+    if chunk_type == "values":
+        return format_sse("values", serialize_values(chunk_data), fast)
+    if chunk_type == "updates":
+        delta = serialize_update(chunk_data)
+        return format_sse("updates", delta, fast) if delta else None
+    return None
@@ -1,70 +1,237 @@
+import os
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+from urllib.parse import urlsplit
 from langchain_community.tools import DuckDuckGoSearchRun
-from langchain_core.tools import tool
-import requests
+from langchain_core.tools import StructuredTool
 from bs4 import BeautifulSoup
+from src.http_client import fetch, afetch
+from src.cache import get_page_cache, search_cache, normalize_query
+from src.extract import extract_text
+from src.ranking import select_passages, select_across_documents
 
-@tool
-def web_search(query: str) -> str:
+SEARCH_URL = "https://html.duckduckgo.com/html/"
+SEARCH_HEADERS = {
+    "Referer": "https://html.duckduckgo.com/"
+}
+
+# Stop downloading a page after this many bytes and rank passages from what arrived
+SCRAPE_MAX_BYTES = int(os.getenv("SCRAPE_MAX_BYTES", str(2 * 1024 * 1024)))
+# Limit text length to avoid context window issues
+SCRAPE_MAX_CHARS = int(os.getenv("SCRAPE_MAX_CHARS", "10000"))
+# How much text to extract (and cache) before ranking picks the best SCRAPE_MAX_CHARS of it
+SCRAPE_EXTRACT_CHARS = int(os.getenv("SCRAPE_EXTRACT_CHARS", "60000"))
+# scrape_many: how many pages one call may read, how many of them may hit the same
+# host at once, and the size of the combined observation
+SCRAPE_MANY_MAX_URLS = int(os.getenv("SCRAPE_MANY_MAX_URLS", "5"))
+SCRAPE_MANY_PER_HOST = int(os.getenv("SCRAPE_MANY_PER_HOST", "2"))
+SCRAPE_MANY_MAX_CHARS = int(os.getenv("SCRAPE_MANY_MAX_CHARS", "15000"))
+# Anything else (PDFs, images, archives) is rejected before the body is read
+SCRAPE_CONTENT_TYPES = ("text/html", "application/xhtml+xml", "text/plain")
+
+def _parse_search_results(content) -> str:
+    soup = BeautifulSoup(content, 'html.parser')
+
+    results = []
+    # Select result links (titles) and snippets
+    for result in soup.select(".result"):
+        title_tag = result.select_one(".result__a")
+        snippet_tag = result.select_one(".result__snippet")
+
+        if title_tag and snippet_tag:
+            title = title_tag.get_text(strip=True)
+            link = title_tag['href']
+            snippet = snippet_tag.get_text(strip=True)
+            results.append(f"Title: {title}\nLink: {link}\nSnippet: {snippet}\n")
+
+            if len(results) >= 5:
+                break
+
+    return "\n---\n".join(results) if results else "No results found."
+
+def _cache_search_result(cache_key: str, result: str) -> str:
+    # Empty result pages are often DuckDuckGo throttling us, so only cache real hits
+    if result != "No results found.":
+        search_cache.put(cache_key, result)
+    return result
+
+def _web_search(query: str) -> str:
+    """Searches the web for information using DuckDuckGo."""
+    cache_key = normalize_query(query)
+    cached = search_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    try:
+        resp = fetch("POST", SEARCH_URL, data={"q": query}, headers=SEARCH_HEADERS)
+        resp.raise_for_status()
+        return _cache_search_result(cache_key, _parse_search_results(resp.content))
+
+    except Exception as e:
+        return f"Search failed: {e}"
+
+async def _aweb_search(query: str) -> str:
     """Searches the web for information using DuckDuckGo."""
+    cache_key = normalize_query(query)
+    cached = search_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
     try:
-        url = "https://html.duckduckgo.com/html/"
-        data = {"q": query}
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-            "Referer": "https://html.duckduckgo.com/"
-        }
-        
-        resp = requests.post(url, data=data, headers=headers, timeout=10)
+        resp = await afetch("POST", SEARCH_URL, data={"q": query}, headers=SEARCH_HEADERS)
         resp.raise_for_status()
-        
-        soup = BeautifulSoup(resp.content, 'html.parser')
-        
-        results = []
-        # Select result links (titles) and snippets
-        for result in soup.select(".result"):
-            title_tag = result.select_one(".result__a")
-            snippet_tag = result.select_one(".result__snippet")
-            
-            if title_tag and snippet_tag:
-                title = title_tag.get_text(strip=True)
-                link = title_tag['href']
-                snippet = snippet_tag.get_text(strip=True)
-                results.append(f"Title: {title}\nLink: {link}\nSnippet: {snippet}\n")
-                
-                if len(results) >= 5:
-                    break
-                    
-        return "\n---\n".join(results) if results else "No results found."
-        
+        return _cache_search_result(cache_key, _parse_search_results(resp.content))
+
     except Exception as e:
         return f"Search failed: {e}"
 
-@tool
-def scrape_webpage(url: str) -> str:
-    """Scrapes the text content from a given URL."""
+def _conditional_headers(entry) -> dict:
+    headers = {}
+    if entry is not None:
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+    return headers
+
+def _fetch_page_text(url: str) -> str:
+    """Returns the extracted text of a page, served from the page cache when possible."""
+    cache = get_page_cache()
+    entry = cache.get(url) if cache else None
+    if entry is not None and entry.is_fresh(cache.ttl):
+        return entry.text
+
+    response = fetch(
+        "GET", url, headers=_conditional_headers(entry),
+        max_bytes=SCRAPE_MAX_BYTES, allowed_types=SCRAPE_CONTENT_TYPES
+    )
+    if response.status_code == 304 and entry is not None:
+        cache.refresh(url)
+        return entry.text
+    response.raise_for_status()
+    text = extract_text(response.content, SCRAPE_EXTRACT_CHARS)
+
+    if cache is not None:
+        cache.put(url, text, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+    return text
+
+async def _afetch_page_text(url: str) -> str:
+    """Async counterpart of `_fetch_page_text`."""
+    cache = get_page_cache()
+    entry = cache.get(url) if cache else None
+    if entry is not None and entry.is_fresh(cache.ttl):
+        return entry.text
+
+    response = await afetch(
+        "GET", url, headers=_conditional_headers(entry),
+        max_bytes=SCRAPE_MAX_BYTES, allowed_types=SCRAPE_CONTENT_TYPES
+    )
+    if response.status_code == 304 and entry is not None:
+        cache.refresh(url)
+        return entry.text
+    response.raise_for_status()
+    # Parsing large pages is CPU-bound, keep it off the event loop
+    text = await asyncio.to_thread(extract_text, response.content, SCRAPE_EXTRACT_CHARS)
+
+    if cache is not None:
+        cache.put(url, text, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+    return text
+
+def _scrape_webpage(url: str, focus: str = "") -> str:
+    """
+    Scrapes the text content from a given URL.
+    Long pages are cut down to the passages that best match `focus`: a few
+    keywords describing what you are looking for (e.g. "tuition fees room board").
+    """
     try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Kill all script and style elements
-        for script in soup(["script", "style"]):
-            script.decompose()
-
-        text = soup.get_text()
-        
-        # Break into lines and remove leading and trailing space on each
-        lines = (line.strip() for line in text.splitlines())
-        # Break multi-headlines into a line each
-        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-        # Drop blank lines
-        text = '\n'.join(chunk for chunk in chunks if chunk)
-        
-        # Limit text length to avoid context window issues
-        return text[:10000] 
-        
+        return select_passages(_fetch_page_text(url), focus, SCRAPE_MAX_CHARS)
     except Exception as e:
         return f"Error scraping {url}: {str(e)}"
+
+async def _ascrape_webpage(url: str, focus: str = "") -> str:
+    """
+    Scrapes the text content from a given URL.
+    Long pages are cut down to the passages that best match `focus`: a few
+    keywords describing what you are looking for (e.g. "tuition fees room board").
+    """
+    try:
+        text = await _afetch_page_text(url)
+        return select_passages(text, focus, SCRAPE_MAX_CHARS)
+    except Exception as e:
+        return f"Error scraping {url}: {str(e)}"
+
+def _dedupe_urls(urls: List[str]) -> List[str]:
+    return list(dict.fromkeys(u.strip() for u in urls if u.strip()))[:SCRAPE_MANY_MAX_URLS]
+
+def _combine_pages(results: list, focus: str) -> str:
+    pages = [(url, text) for url, text, error in results if error is None]
+    errors = [f"Error scraping {url}: {error}" for url, _, error in results if error is not None]
+    combined = select_across_documents(pages, focus, SCRAPE_MANY_MAX_CHARS)
+    return "\n\n".join(part for part in [combined] + errors if part) or "No pages scraped."
+
+def _scrape_many(urls: List[str], focus: str = "") -> str:
+    """
+    Scrapes several URLs at once and returns one combined observation, with the
+    passages that best match `focus` (e.g. "rent groceries utilities") from all
+    pages, grouped by source. Prefer this over repeated scrape_webpage calls when
+    you already have 2-3 promising links.
+    """
+    urls = _dedupe_urls(urls)
+    host_limits = {urlsplit(url).hostname: threading.BoundedSemaphore(SCRAPE_MANY_PER_HOST) for url in urls}
+
+    def scrape_one(url):
+        with host_limits[urlsplit(url).hostname]:
+            try:
+                return url, _fetch_page_text(url), None
+            except Exception as e:
+                return url, "", str(e)
+
+    if not urls:
+        return "No pages scraped."
+    with ThreadPoolExecutor(max_workers=len(urls)) as pool:
+        results = list(pool.map(scrape_one, urls))
+    return _combine_pages(results, focus)
+
+async def _ascrape_many(urls: List[str], focus: str = "") -> str:
+    """
+    Scrapes several URLs at once and returns one combined observation, with the
+    passages that best match `focus` (e.g. "rent groceries utilities") from all
+    pages, grouped by source. Prefer this over repeated scrape_webpage calls when
+    you already have 2-3 promising links.
+    """
+    urls = _dedupe_urls(urls)
+    host_limits = {urlsplit(url).hostname: asyncio.Semaphore(SCRAPE_MANY_PER_HOST) for url in urls}
+
+    async def scrape_one(url):
+        async with host_limits[urlsplit(url).hostname]:
+            try:
+                return url, await _afetch_page_text(url), None
+            except Exception as e:
+                return url, "", str(e)
+
+    if not urls:
+        return "No pages scraped."
+    results = await asyncio.gather(*(scrape_one(url) for url in urls))
+    return _combine_pages(results, focus)
+
+# Each tool carries both implementations: the CLI's sync graph calls `func`,
+# while `ainvoke`/`astream` (FastAPI, MCP) await `coroutine` without blocking the loop.
+web_search = StructuredTool.from_function(
+    func=_web_search,
+    coroutine=_aweb_search,
+    name="web_search"
+)
+
+scrape_webpage = StructuredTool.from_function(
+    func=_scrape_webpage,
+    coroutine=_ascrape_webpage,
+    name="scrape_webpage"
+)
+
+scrape_many = StructuredTool.from_function(
+    func=_scrape_many,
+    coroutine=_ascrape_many,
+    name="scrape_many"
+)
@@ -0,0 +1,115 @@
+import os
+import math
+import time
+import asyncio
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+
+load_dotenv()
+
+class PoolSaturated(Exception):
+    """Raised when every worker is busy and the backlog is full. `retry_after` is a hint in seconds."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"research capacity exhausted, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+class WorkerPool:
+    """
+    Fixed-size thread pool for blocking research runs, with admission control.
+
+    At most `workers` runs execute at once and at most `queue_size` more wait for
+    a free worker. Anything beyond that is rejected immediately with a Retry-After
+    estimate, so under overload callers get a fast, explicit answer and queued
+    requests keep a bounded wait instead of every request timing out.
+    """
+
+    def __init__(self, workers: int, queue_size: int, history: int = 200):
+        self.workers = workers
+        self.queue_size = queue_size
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="research")
+        self._lock = threading.Lock()
+        self.running = 0
+        self.queued = 0
+        self.completed = 0
+        self.rejected = 0
+        self.cancelled = 0
+        # Recent queue waits and run times in seconds, for stats and Retry-After
+        self._waits = deque(maxlen=history)
+        self._runs = deque(maxlen=history)
+
+    def _retry_after(self) -> int:
+        # Time for the backlog ahead of a new request to drain, from recent run times
+        avg_run = sum(self._runs) / len(self._runs) if self._runs else 30.0
+        return max(1, math.ceil(avg_run * (self.queued + 1) / self.workers))
+
+    def _admit(self):
+        with self._lock:
+            if self.running + self.queued >= self.workers + self.queue_size:
+                self.rejected += 1
+                raise PoolSaturated(self._retry_after())
+            self.queued += 1
+
+    async def run(self, fn, *args):
+        """Runs `fn(*args)` on a worker thread and returns its result, or raises PoolSaturated."""
+        self._admit()
+        submitted = time.monotonic()
+
+        def job():
+            started = time.monotonic()
+            with self._lock:
+                self.queued -= 1
+                self.running += 1
+                self._waits.append(started - submitted)
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self.running -= 1
+                    self.completed += 1
+                    self._runs.append(time.monotonic() - started)
+
+        def release_if_cancelled(future):
+            # A caller that goes away (e.g. client disconnect) cancels the future; if
+            # that happens before a worker picks it up, job() never runs to free the slot
+            if future.cancelled():
+                with self._lock:
+                    self.queued -= 1
+                    self.cancelled += 1
+
+        try:
+            future = self._executor.submit(job)
+        except RuntimeError:
+            # Executor shut down before the job was queued
+            with self._lock:
+                self.queued -= 1
+            raise
+        future.add_done_callback(release_if_cancelled)
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> dict:
+        with self._lock:
+            waits = sorted(self._waits)
+            return {
+                "workers": self.workers,
+                "queue_size": self.queue_size,
+                "running": self.running,
+                "queued": self.queued,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "cancelled": self.cancelled,
+                "avg_wait_s": round(sum(waits) / len(waits), 3) if waits else 0.0,
+                "p95_wait_s": round(waits[min(len(waits) - 1, int(len(waits) * 0.95))], 3) if waits else 0.0,
+                "avg_run_s": round(sum(self._runs) / len(self._runs), 3) if self._runs else 0.0
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+# Shared by the blocking API research endpoints
+research_pool = WorkerPool(
+    workers=int(os.getenv("WORKER_POOL_SIZE", "4")),
+    queue_size=int(os.getenv("WORKER_QUEUE_SIZE", "16"))
+)
@@ -31,8 +31,24 @@ def run_script(script_path):
 def main():
     scripts = [
         "verification/verify_tools.py",
+        "verification/verify_http_client.py",
+        "verification/verify_cache.py",
+        "verification/verify_extract.py",
+        "verification/verify_ranking.py",
+        "verification/verify_rate_limit.py",
+        "verification/verify_replay.py",
         "verification/verify_personalized_cost.py",
         "verification/verify_orchestrator.py",
+        "verification/verify_router.py",
+        "verification/verify_slots.py",
+        "verification/verify_async_nodes.py",
+        "verification/verify_streaming.py",
+        "verification/verify_history.py",
+        "verification/verify_compaction.py",
+        "verification/verify_singleflight.py",
+        "verification/verify_worker_pool.py",
+        "verification/verify_jobs.py",
+        "verification/verify_compare.py",
         "verification/verify_cli.py",
         "verification/verify_scope.py"
     ]
@@ -0,0 +1,81 @@
+import os
+import sys
+import time
+import asyncio
+import unittest
+from unittest.mock import patch
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.memory import MemorySaver
+
+# Add parent directory to path so we can import src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ["FACT_STORE_ENABLED"] = "false"
+
+from src.orchestrator import build_orchestrator_workflow
+
+DELAY = 0.5
+STREAMS = 8
+
+class SlowRunnable:
+    """Stand-in for the research agent and chat model: DELAY seconds per call, sync or async."""
+
+    def __init__(self, reply):
+        self.reply = reply
+
+    def _result(self, inputs):
+        message = AIMessage(content=self.reply)
+        return {"messages": [message]} if isinstance(inputs, dict) else message
+
+    def invoke(self, inputs, config=None):
+        time.sleep(DELAY)
+        return self._result(inputs)
+
+    async def ainvoke(self, inputs, config=None):
+        await asyncio.sleep(DELAY)
+        return self._result(inputs)
+
+class TestAsyncNodes(unittest.TestCase):
+
+    def setUp(self):
+        patches = [
+            patch("src.orchestrator.get_agent", return_value=SlowRunnable("Tuition is $60,000 per year.")),
+            patch("src.orchestrator.get_model", return_value=SlowRunnable("What major are you planning?")),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+        self.graph = build_orchestrator_workflow().compile(checkpointer=MemorySaver())
+
+    def inputs(self):
+        return {"messages": [HumanMessage(content="I'm going to Stanford University")]}
+
+    def test_sync_graph_still_works(self):
+        result = self.graph.invoke(self.inputs(), config={"configurable": {"thread_id": "cli"}})
+        self.assertTrue(result["tuition_found"])
+        self.assertEqual(result["college_name"], "Stanford University")
+        self.assertEqual(result["messages"][-1].content, "What major are you planning?")
+
+    def test_parallel_streams_do_not_block_each_other(self):
+        async def one_stream(i):
+            chunks = []
+            config = {"configurable": {"thread_id": f"user-{i}"}}
+            async for chunk in self.graph.astream(self.inputs(), config=config, stream_mode="updates"):
+                chunks.append(chunk)
+            return chunks
+
+        async def run_all():
+            start = time.perf_counter()
+            results = await asyncio.gather(*(one_stream(i) for i in range(STREAMS)))
+            return time.perf_counter() - start, results
+
+        elapsed, results = asyncio.run(run_all())
+        # Each stream makes two slow calls (tuition agent, then orchestrator)
+        single = 2 * DELAY
+        print(f"{STREAMS} streams finished in {elapsed:.2f}s (one stream: ~{single:.2f}s)")
+        self.assertLess(elapsed, single * 2)
+        for chunks in results:
+            self.assertTrue(any("tuition_agent" in chunk for chunk in chunks))
+
+if __name__ == '__main__':
+    unittest.main()
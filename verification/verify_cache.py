@@ -0,0 +1,189 @@
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import unittest
+import warnings
+from unittest.mock import patch
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration
+
+# Add parent directory to path so we can import src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.cache import PageCache, TTLCache, normalize_url, normalize_query
+from src.fact_store import FactStore, make_key
+from src.http_client import FetchResult
+from src.llm_cache import SQLiteLLMCache
+from src.tools import _fetch_page_text, _afetch_page_text
+
+class TestPageCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "pages.sqlite")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_normalize_url(self):
+        """Equivalent URLs map to the same cache key."""
+        self.assertEqual(
+            normalize_url("HTTPS://Admission.Stanford.edu:443/tuition/?b=2&utm_source=x&a=1#fees"),
+            "https://admission.stanford.edu/tuition?a=1&b=2"
+        )
+        self.assertEqual(PageCache.key_for("https://example.com/"), PageCache.key_for("https://EXAMPLE.com"))
+
+    def test_validators_roundtrip(self):
+        """Stored text comes back together with its ETag/Last-Modified validators."""
+        cache = PageCache(self.db_path, ttl=60, max_bytes=1024 * 1024)
+        cache.put("https://example.com/cost", "Tuition: $60,000", etag='"abc"', last_modified="Mon, 01 Sep 2025 00:00:00 GMT")
+
+        entry = cache.get("https://example.com/cost?utm_campaign=fall")
+        self.assertEqual(entry.text, "Tuition: $60,000")
+        self.assertEqual(entry.etag, '"abc"')
+        self.assertTrue(entry.is_fresh(cache.ttl))
+        self.assertFalse(entry.is_fresh(0))
+
+    def test_lru_eviction(self):
+        """Least recently used pages are evicted once the size budget is exceeded."""
+        cache = PageCache(self.db_path, ttl=60, max_bytes=250)
+        cache.put("https://a.edu", "a" * 100)
+        cache.put("https://b.edu", "b" * 100)
+        cache.get("https://a.edu")
+        cache.put("https://c.edu", "c" * 100)
+
+        self.assertIsNotNone(cache.get("https://a.edu"))
+        self.assertIsNone(cache.get("https://b.edu"))
+        self.assertIsNotNone(cache.get("https://c.edu"))
+
+class TestRevalidation(unittest.TestCase):
+    """An expired page is revalidated with a conditional request instead of re-downloaded."""
+
+    URL = "https://example.com/cost"
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache = PageCache(os.path.join(self.tmpdir.name, "pages.sqlite"), ttl=60, max_bytes=1024 * 1024)
+        self.cache.put(self.URL, "Tuition: $60,000", etag='"abc"', last_modified="Mon, 01 Sep 2025 00:00:00 GMT")
+        # Age the entry past its TTL
+        self.stale_at = time.time() - 3600
+        self.cache._conn.execute("UPDATE pages SET fetched_at = ?", (self.stale_at,))
+        self.cache._conn.commit()
+        self.sent_headers = []
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def not_modified(self, method, url, data=None, headers=None, **kwargs):
+        self.sent_headers.append(headers)
+        return FetchResult(304, url, {}, b"", False)
+
+    async def anot_modified(self, *args, **kwargs):
+        return self.not_modified(*args, **kwargs)
+
+    def assert_revalidated(self, text):
+        self.assertEqual(text, "Tuition: $60,000")
+        self.assertEqual(self.sent_headers, [{
+            "If-None-Match": '"abc"',
+            "If-Modified-Since": "Mon, 01 Sep 2025 00:00:00 GMT"
+        }])
+        entry = self.cache.get(self.URL)
+        self.assertGreater(entry.fetched_at, self.stale_at)
+        self.assertTrue(entry.is_fresh(self.cache.ttl))
+
+    def test_sync_304_serves_stored_text(self):
+        with patch("src.tools.get_page_cache", return_value=self.cache), \
+             patch("src.tools.fetch", side_effect=self.not_modified):
+            self.assert_revalidated(_fetch_page_text(self.URL))
+
+    def test_async_304_serves_stored_text(self):
+        with patch("src.tools.get_page_cache", return_value=self.cache), \
+             patch("src.tools.afetch", side_effect=self.anot_modified):
+            self.assert_revalidated(asyncio.run(_afetch_page_text(self.URL)))
+
+class TestSearchCache(unittest.TestCase):
+
+    def test_normalize_query(self):
+        """Rephrasings that differ only in case, filler words and order share a key."""
+        self.assertEqual(
+            normalize_query("Stanford  tuition and fees 2025"),
+            normalize_query("fees for the stanford TUITION 2025")
+        )
+        self.assertNotEqual(normalize_query("Boston College tuition"), normalize_query("Boston University tuition"))
+        self.assertNotEqual(normalize_query("Stanford tuition 2024"), normalize_query("Stanford tuition 2025"))
+
+    def test_lru_ttl_and_counters(self):
+        cache = TTLCache(max_entries=2, ttl=60)
+        cache.put("a", "A")
+        cache.put("b", "B")
+        self.assertEqual(cache.get("a"), "A")
+        cache.put("c", "C")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+        expired = TTLCache(max_entries=2, ttl=0)
+        expired.put("a", "A")
+        self.assertIsNone(expired.get("a"))
+
+class TestLLMCache(unittest.TestCase):
+
+    def test_hit_roundtrips_tool_calls_without_warnings(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = SQLiteLLMCache(os.path.join(tmpdir, "llm.sqlite"), ttl=60, max_entries=10)
+            message = AIMessage(content="", tool_calls=[{"name": "web_search", "args": {"query": "rice tuition"}, "id": "call_1"}])
+            cache.update("prompt", "gpt-4o-mini", [ChatGeneration(message=message)])
+            with warnings.catch_warnings(record=True) as caught:
+                hit = cache.lookup("prompt", "gpt-4o-mini")
+            self.assertEqual([str(w.message) for w in caught], [])
+            self.assertEqual(hit[0].message.tool_calls[0]["args"], {"query": "rice tuition"})
+            cache._conn.close()
+
+    def test_hits_get_fresh_message_ids(self):
+        from langchain_core.language_models.fake_chat_models import FakeListChatModel
+        from langgraph.graph.message import add_messages
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = SQLiteLLMCache(os.path.join(tmpdir, "llm.sqlite"), ttl=60, max_entries=10)
+            cache.update("prompt", "gpt-4o-mini", [ChatGeneration(message=AIMessage(content="Tuition is $60,000.", id="run-1"))])
+            self.assertIsNone(cache.lookup("prompt", "gpt-4o-mini")[0].message.id)
+
+            # The same cached answer served on two turns stays two messages in the thread
+            model = FakeListChatModel(responses=["Tuition is $60,000."], cache=cache)
+            first = model.invoke("What is Rice tuition?")
+            second = model.invoke("What is Rice tuition?")
+            self.assertNotEqual(first.id, second.id)
+            self.assertEqual(len(add_messages([first], [second])), 2)
+            cache._conn.close()
+
+class TestFactStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.store = FactStore(os.path.join(self.tmpdir.name, "facts.sqlite"))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_location_research_is_shared_across_colleges(self):
+        """Tax research for a city is reused whatever college or major asked for it."""
+        self.store.put(make_key("taxes", "Stanford University", "Economics", "Detroit, MI"), "Michigan: 4.25%")
+        self.assertEqual(self.store.get(make_key("taxes", "University of Michigan", "", "detroit mi")), "Michigan: 4.25%")
+        self.assertIsNone(self.store.get(make_key("taxes", "", "", "Austin, TX")))
+
+    def test_required_target_missing(self):
+        self.assertIsNone(make_key("tuition", "", "Economics", "Detroit, MI"))
+
+    def test_freshness_window(self):
+        key = make_key("tuition", "Stanford University")
+        self.store.put(key, "$65,127")
+        os.environ["FACT_TTL_TUITION"] = "0"
+        try:
+            self.assertIsNone(self.store.get(key))
+        finally:
+            del os.environ["FACT_TTL_TUITION"]
+        self.assertEqual(self.store.get(key), "$65,127")
+
+if __name__ == '__main__':
+    unittest.main()
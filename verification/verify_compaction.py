@@ -0,0 +1,78 @@
+import os
+import sys
+import unittest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langgraph.prebuilt import create_react_agent
+from langchain_core.tools import tool
+
+# Add parent directory to path so we can import src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.compaction import compact_messages, compact_observations, digest
+
+PAGE = "SOURCE: https://example.edu/costs\n" + "\n".join(
+    ["The campus is home to many traditions and student organizations."] * 60
+    + ["Tuition: $62,484", "Room and board: $19,922", "Average aid covers 54% of costs"]
+)
+
+def call(name, args, call_id):
+    return AIMessage(content="", tool_calls=[{"name": name, "args": args, "id": call_id}])
+
+class TestCompaction(unittest.TestCase):
+
+    def test_digest_keeps_figures_and_sources(self):
+        self.assertEqual(
+            digest(PAGE, 800),
+            "SOURCE: https://example.edu/costs\nTuition: $62,484\nRoom and board: $19,922\nAverage aid covers 54% of costs"
+        )
+
+    def test_only_used_observations_are_compacted(self):
+        messages = [
+            HumanMessage(content="Find tuition"),
+            call("scrape_webpage", {"url": "https://example.edu/costs"}, "c1"),
+            ToolMessage(content=PAGE, tool_call_id="c1", name="scrape_webpage"),
+            call("scrape_webpage", {"url": "https://example.edu/aid"}, "c2"),
+            ToolMessage(content=PAGE, tool_call_id="c2", name="scrape_webpage"),
+        ]
+        compacted = compact_messages(messages)
+        self.assertLess(len(compacted[2].content), 300)
+        self.assertIn("https://example.edu/costs", compacted[2].content)
+        self.assertIn("$62,484", compacted[2].content)
+        # The newest result hasn't been read by the model yet
+        self.assertEqual(compacted[4].content, PAGE)
+        # The original list is untouched
+        self.assertEqual(messages[2].content, PAGE)
+
+    def test_agent_state_keeps_full_outputs(self):
+        seen = []
+
+        class RecordingModel(GenericFakeChatModel):
+            def bind_tools(self, tools, **kwargs):
+                return self
+
+            def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+                seen.append(messages)
+                return super()._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+        @tool
+        def scrape_webpage(url: str) -> str:
+            """Scrapes a page."""
+            return PAGE
+
+        model = RecordingModel(messages=iter([
+            call("scrape_webpage", {"url": "https://example.edu/a"}, "c1"),
+            call("scrape_webpage", {"url": "https://example.edu/b"}, "c2"),
+            AIMessage(content="Tuition is $62,484."),
+        ]))
+        agent = create_react_agent(model, [scrape_webpage], pre_model_hook=compact_observations)
+        result = agent.invoke({"messages": [HumanMessage(content="Find tuition")]})
+
+        self.assertEqual(len(seen), 3)
+        self.assertEqual(seen[1][-1].content, PAGE)
+        self.assertNotEqual(seen[2][2].content, PAGE)
+        self.assertEqual(seen[2][-1].content, PAGE)
+        self.assertEqual([m.content for m in result["messages"] if isinstance(m, ToolMessage)], [PAGE, PAGE])
+
+if __name__ == '__main__':
+    unittest.main()
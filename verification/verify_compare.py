@@ -0,0 +1,111 @@
+import os
+import sys
+import json
+import asyncio
+import tempfile
+import unittest
+from unittest.mock import patch
+import httpx
+from langchain_core.messages import AIMessage
+
+# Add parent directory to path so we can import src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.fact_store import FactStore
+from src.research import BatchComparison, CollegeTarget
+
+class FakeAgent:
+    """Answers every research request after a delay, recording requests and peak concurrency."""
+
+    def __init__(self, slow_college=None):
+        self.requests = []
+        self.active = 0
+        self.peak = 0
+        self.slow_college = slow_college
+
+    async def ainvoke(self, inputs):
+        request = inputs["messages"][-1].content
+        self.requests.append(request)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.3 if self.slow_college and self.slow_college in request else 0.02)
+        self.active -= 1
+        return {"messages": [AIMessage(content=f"Answer to: {request}")]}
+
+COLLEGES = [
+    CollegeTarget(college_name="Rice University", major="Economics", location="Austin, TX"),
+    CollegeTarget(college_name="Duke University", location="austin, tx"),
+    CollegeTarget(college_name="Stanford University", major="Computer Science", location="Austin, Texas"),
+    CollegeTarget(college_name="Emory University", location="Atlanta, GA"),
+    CollegeTarget(college_name="Tulane University"),
+]
+
+def run_batch(comparison):
+    async def collect():
+        return [result async for result in comparison.results()]
+    return asyncio.run(collect())
+
+class TestCompare(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.facts = FactStore(os.path.join(self.tmpdir.name, "facts.sqlite"))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_city_research_is_shared(self):
+        agent = FakeAgent(slow_college="Rice University")
+        comparison = BatchComparison(COLLEGES, parallelism=3)
+        with patch("src.research.get_agent", return_value=agent), patch("src.research.get_fact_store", return_value=self.facts):
+            results = run_batch(comparison)
+
+        # 5 tuition + 5 salary + taxes and living costs for 2 cities
+        self.assertEqual(len(agent.requests), 14)
+        self.assertEqual(sum("Austin" in r or "austin" in r for r in agent.requests), 2)
+        self.assertEqual(comparison.stats(), {"colleges": 5, "subqueries": 18, "unique_subqueries": 14})
+        self.assertLessEqual(agent.peak, 3)
+
+        by_college = {r["college_name"]: r for r in results}
+        self.assertEqual(by_college["Duke University"]["taxes"], by_college["Rice University"]["taxes"])
+        self.assertEqual(by_college["Stanford University"]["location"], "Austin, TX")
+        self.assertEqual(by_college["Stanford University"]["living_costs"], by_college["Rice University"]["living_costs"])
+        self.assertNotIn("taxes", by_college["Tulane University"])
+        self.assertIn("majoring in Economics", by_college["Rice University"]["salary"])
+        # Results stream in completion order: the slow college comes last
+        self.assertEqual(results[-1]["college_name"], "Rice University")
+
+        # A later batch is served from the fact store
+        repeat = FakeAgent()
+        with patch("src.research.get_agent", return_value=repeat), patch("src.research.get_fact_store", return_value=self.facts):
+            run_batch(BatchComparison(COLLEGES[:2], parallelism=3))
+        self.assertEqual(repeat.requests, [])
+
+    def test_compare_endpoint_streams_per_college(self):
+        import server
+
+        async def main():
+            transport = httpx.ASGITransport(app=server.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                body = {"colleges": [c.model_dump() for c in COLLEGES[:3]], "parallelism": 2}
+                streamed = await client.post("/compare", json=body)
+                empty = await client.post("/compare", json={"colleges": []})
+            return streamed, empty
+
+        with patch("src.research.get_agent", return_value=FakeAgent()), patch("src.research.get_fact_store", return_value=self.facts):
+            streamed, empty = asyncio.run(main())
+
+        frames = [frame.split("\n") for frame in streamed.text.strip().split("\n\n")]
+        events = [(lines[0][len("event: "):], json.loads(lines[1][len("data: "):])) for lines in frames]
+        self.assertEqual([event for event, _ in events], ["college"] * 3 + ["done"])
+        self.assertEqual(events[-1][1], {"colleges": 3, "subqueries": 12, "unique_subqueries": 8})
+        self.assertEqual(empty.status_code, 422)
+
+    def test_mcp_tool_validates_like_rest(self):
+        from mcp_server import compare_colleges
+        self.assertEqual(asyncio.run(compare_colleges([])), "Error: colleges must not be empty.")
+        with patch.dict(os.environ, {"COMPARE_MAX_COLLEGES": "2"}):
+            self.assertEqual(asyncio.run(compare_colleges(COLLEGES[:3])), "Error: At most 2 colleges can be compared at once.")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import sys
+import unittest
+
+# Add parent directory to path so we can import src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.extract import EXTRACTORS, extract_text_bs4
+
+COST_PAGE = b"""<html><head><title>Cost of Attendance</title><style>td { color: red }</style></head>
+<body><h1>2025-26 Cost of Attendance</h1>
+<script>var tracking = "tuition";</script>
+<table>
+<tr><td>Tuition and fees</td>
+<td>$65,127</td></tr>
+<tr><td>Room and board</td>
+<td>$21,315</td></tr>
+</table>
+<ul>
+<li>Books: $1,290</li>
+<li>Personal: $2,700</li>
+</ul>
+<p>Costs are   estimates.<!-- updated yearly --> Aid is available.</p>
+</body></html>"""
+
+PAGE_WITH_CHROME = b"""<html><body>
+<nav><a href="/">Home</a><a href="/apply">Apply</a></nav>
+<main><p>Tuition: $60,000</p></main>
+<footer>Copyright 2025</footer>
+</body></html>"""
+
+# UTF-8 without a <meta charset>: must not be read as Latin-1
+UTF8_PAGE = "<html><body><h1>Résidence Hall — 2025–26</h1>\n<p>Room and board: €12,000</p></body></html>".encode("utf-8")
+
+EMPTY_DOCUMENTS = [b"   \n\t", b"<!-- c -->", "<!-- only -->\n<!-- comments -->"]
+
+@unittest.skipUnless("lxml" in EXTRACTORS, "lxml is not installed")
+class TestExtractors(unittest.TestCase):
+
+    def setUp(self):
+        self.extract_text_lxml = EXTRACTORS["lxml"]
+
+    def test_backends_agree(self):
+        for content in (COST_PAGE, COST_PAGE.decode("utf-8")):
+            self.assertEqual(self.extract_text_lxml(content, 10000), extract_text_bs4(content, 10000))
+        text = self.extract_text_lxml(COST_PAGE, 10000)
+        self.assertIn("Tuition and fees\n$65,127", text)
+        self.assertNotIn("tracking", text)
+        self.assertNotIn("color", text)
+
+    def test_non_ascii_page_without_charset(self):
+        expected = "Résidence Hall — 2025–26\nRoom and board: €12,000"
+        self.assertEqual(extract_text_bs4(UTF8_PAGE, 10000), expected)
+        self.assertEqual(self.extract_text_lxml(UTF8_PAGE, 10000), expected)
+        latin1 = UTF8_PAGE.decode("utf-8").replace("€", "EUR ").replace("—", "-").replace("–", "-")
+        latin1 = latin1.replace("<html>", '<html><head><meta charset="iso-8859-1"></head>').encode("iso-8859-1")
+        self.assertIn("Résidence Hall", self.extract_text_lxml(latin1, 10000))
+
+    def test_max_chars(self):
+        for extract in (self.extract_text_lxml, extract_text_bs4):
+            self.assertEqual(extract(COST_PAGE, 40), extract_text_bs4(COST_PAGE, 10000)[:40])
+
+    def test_empty_documents(self):
+        for content in EMPTY_DOCUMENTS:
+            self.assertEqual(self.extract_text_lxml(content, 10000), "")
+            self.assertEqual(extract_text_bs4(content, 10000), "")
+
+    def test_lxml_skips_navigation(self):
+        self.assertEqual(self.extract_text_lxml(PAGE_WITH_CHROME, 10000), "Tuition: $60,000")
+
+if __name__ == '__main__':
+    unittest.main()
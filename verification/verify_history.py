@@ -0,0 +1,67 @@
+import os
+import sys
+import unittest
+from unittest.mock import patch
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.memory import MemorySaver
+
+# Add parent directory to path so we can import src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ["HISTORY_KEEP_TURNS"] = "2"
+os.environ["HISTORY_MAX_TURNS"] = "4"
+
+from src.history import split_history, render_transcript
+from src.orchestrator import build_orchestrator_workflow
+
+class RecordingModel:
+    """Fake chat model that remembers the size of every prompt it receives."""
+
+    def __init__(self, reply):
+        self.reply = reply
+        self.prompt_sizes = []
+        self.prompts = []
+
+    def invoke(self, messages, config=None):
+        self.prompts.append(messages)
+        self.prompt_sizes.append(len(messages))
+        return AIMessage(content=self.reply.format(n=len(self.prompts)))
+
+class TestHistory(unittest.TestCase):
+
+    def test_split_keeps_whole_recent_turns(self):
+        messages = []
+        for i in range(5):
+            messages += [HumanMessage(content=f"q{i}"), AIMessage(content=f"a{i}"), AIMessage(content=f"research {i}")]
+        self.assertEqual(split_history(messages, keep=2, limit=5), ([], messages))
+        folded, kept = split_history(messages, keep=2, limit=4)
+        self.assertEqual([m.content for m in kept], ["q3", "a3", "research 3", "q4", "a4", "research 4"])
+        self.assertEqual(folded + kept, messages)
+
+    def test_transcript_drops_sources(self):
+        answer = AIMessage(content="Tuition is $60,000.\nSOURCES:\nhttps://example.edu/tuition")
+        self.assertEqual(render_transcript([HumanMessage(content="Cost?"), answer]), "User: Cost?\n\nAssistant: Tuition is $60,000.")
+
+    def test_long_thread_stays_bounded(self):
+        chat = RecordingModel("Tell me more (reply {n}).")
+        summarizer = RecordingModel("Summary #{n}")
+        with patch("src.orchestrator.get_model", return_value=chat), \
+             patch("src.orchestrator._summarizer", return_value=summarizer), \
+             patch("src.orchestrator._extract_slots_with_llm", return_value={}):
+            graph = build_orchestrator_workflow().compile(checkpointer=MemorySaver())
+            config = {"configurable": {"thread_id": "long-thread"}}
+            for turn in range(12):
+                result = graph.invoke({"messages": [HumanMessage(content=f"Just chatting, turn {turn}")]}, config=config)
+
+        # At most HISTORY_MAX_TURNS turns of two messages each are ever held or sent
+        self.assertLessEqual(len(result["messages"]), 4 * 2)
+        self.assertLessEqual(max(chat.prompt_sizes), 1 + 1 + 4 * 2)
+        self.assertEqual(result["messages"][-2].content, "Just chatting, turn 11")
+        # Folded turns are carried in the summary, and the summary reaches the orchestrator
+        self.assertGreater(len(summarizer.prompts), 1)
+        self.assertEqual(result["summary"], f"Summary #{len(summarizer.prompts)}")
+        self.assertIn(result["summary"], chat.prompts[-1][1].content)
+        self.assertIn("Summary #", summarizer.prompts[-1][1].content)
+
+if __name__ == '__main__':
+    unittest.main()
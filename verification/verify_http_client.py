@@ -0,0 +1,113 @@
+import asyncio
+import os
+import sys
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+# Add parent directory to path so we can import src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.http_client import fetch, afetch, aclose_async_client, UnsupportedContentType
+from src.rate_limit import HostRateLimiter
+
+HTML = b"<html><body>" + b"<p>Tuition and fees: $60,000</p>" * 4000 + b"</body></html>"
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/page":
+            self.reply(200, "text/html; charset=utf-8", HTML)
+        elif self.path == "/stream":
+            # No Content-Length: the read is stopped by the byte budget alone
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.end_headers()
+            try:
+                for _ in range(64):
+                    self.wfile.write(HTML)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+        elif self.path == "/brochure.pdf":
+            self.reply(200, "application/pdf", b"%PDF-1.4" + b"\0" * 1024)
+        elif self.path == "/mirror":
+            self.reply(203, "text/html", b"<p>Room and board: $18,000</p>")
+        elif self.path == "/cached":
+            self.send_response(304)
+            self.end_headers()
+        else:
+            self.reply(404, "text/html", b"not found")
+
+    def reply(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+class TestFetch(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        limiter = patch("src.http_client.rate_limiter", HostRateLimiter(rate=1000, burst=1000, max_wait=1))
+        limiter.start()
+        self.addCleanup(limiter.stop)
+
+    def both(self, *args, **kwargs):
+        """Runs the same request through fetch and afetch."""
+        async def async_fetch():
+            try:
+                return await afetch(*args, **kwargs)
+            finally:
+                await aclose_async_client()
+        return [fetch(*args, **kwargs), asyncio.run(async_fetch())]
+
+    def test_within_budget(self):
+        for result in self.both("GET", f"{self.base}/page", max_bytes=len(HTML)):
+            self.assertEqual(result.content, HTML)
+            self.assertFalse(result.truncated)
+
+    def test_declared_length_over_budget_stops_at_budget(self):
+        # A large page is truncated the same way whether or not it declares its length
+        for result in self.both("GET", f"{self.base}/page", max_bytes=1024):
+            self.assertTrue(result.truncated)
+            self.assertEqual(result.content, HTML[:1024])
+
+    def test_undeclared_length_stops_at_budget(self):
+        budget = 200 * 1024
+        for result in self.both("GET", f"{self.base}/stream", max_bytes=budget):
+            self.assertTrue(result.truncated)
+            self.assertEqual(len(result.content), budget)
+
+    def test_content_type_rejected(self):
+        allowed = ("text/html",)
+        with self.assertRaises(UnsupportedContentType):
+            fetch("GET", f"{self.base}/brochure.pdf", allowed_types=allowed)
+        with self.assertRaises(UnsupportedContentType):
+            asyncio.run(afetch("GET", f"{self.base}/brochure.pdf", allowed_types=allowed))
+
+    def test_status_codes(self):
+        # Any 2xx keeps its body; 304 and errors come back empty
+        for result in self.both("GET", f"{self.base}/mirror"):
+            self.assertEqual(result.status_code, 203)
+            self.assertEqual(result.content, b"<p>Room and board: $18,000</p>")
+        for result in self.both("GET", f"{self.base}/cached"):
+            self.assertEqual((result.status_code, result.content), (304, b""))
+        for result in self.both("GET", f"{self.base}/missing"):
+            self.assertEqual((result.status_code, result.content), (404, b""))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,161 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import tempfile
+import unittest
+from unittest.mock import patch
+import httpx
+from langchain_core.messages import AIMessage, ToolMessage
+
+# Add parent directory to path so we can import src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.jobs import JobManager, JobStore
+
+def parse_sse(body: str):
+    """(event, data) pairs from an SSE body, skipping comments."""
+    events = []
+    for frame in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in frame.split("\n") if not line.startswith(":"))
+        if "event" in fields:
+            events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+class TestJobs(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "jobs.sqlite")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_store_persists_and_dedupes(self):
+        store = JobStore(self.db_path)
+        job = store.create("tuition", {"college_name": "Rice University"})
+        self.assertEqual(store.find_reusable("tuition", {"college_name": "rice university"}, 3600)["id"], job["id"])
+        store.add_event(job["id"], {"type": "tool_call", "tool": "web_search"})
+        store.set_status(job["id"], "succeeded", result={"tuition_info": "$60,000"})
+
+        reopened = JobStore(self.db_path)
+        self.assertEqual(reopened.get(job["id"])["result"], {"tuition_info": "$60,000"})
+        self.assertEqual(reopened.events(job["id"]), [(1, {"type": "tool_call", "tool": "web_search"})])
+        self.assertEqual(reopened.find_reusable("tuition", {"college_name": "Rice University"}, 3600)["id"], job["id"])
+        # Results older than the reuse window are researched again
+        self.assertIsNone(reopened.find_reusable("tuition", {"college_name": "Rice University"}, 0))
+        self.assertIsNone(reopened.find_reusable("tuition", {"college_name": "Duke University"}, 3600))
+
+    def test_store_prunes_finished_jobs(self):
+        store = JobStore(self.db_path)
+        finished = store.create("tuition", {"college_name": "Rice University"})
+        store.add_event(finished["id"], {"type": "tool_call", "tool": "web_search"})
+        store.set_status(finished["id"], "succeeded", result={"tuition_info": "$60,000"})
+        running = store.create("tuition", {"college_name": "Duke University"})
+        store.set_status(running["id"], "running")
+
+        self.assertEqual(store.prune(3600), 0)
+        self.assertEqual(store.prune(0), 1)
+        self.assertIsNone(store.get(finished["id"]))
+        self.assertEqual(store.events(finished["id"]), [])
+        # Unfinished jobs are kept however old they are
+        self.assertEqual(store.get(running["id"])["status"], "running")
+
+    def test_manager_runs_dedupes_and_recovers(self):
+        runs = []
+
+        def runner(params, emit):
+            runs.append(params["college_name"])
+            emit({"type": "tool_call", "tool": "web_search"})
+            time.sleep(0.05)
+            if params["college_name"] == "Nowhere College":
+                raise RuntimeError("no results")
+            return {"answer": f"Tuition for {params['college_name']}"}
+
+        async def main():
+            manager = JobManager(JobStore(self.db_path), {"tuition": runner}, workers=2, reuse_ttl=3600)
+            await manager.start()
+            first, created = manager.submit("tuition", {"college_name": "Rice University"})
+            duplicate, duplicate_created = manager.submit("tuition", {"college_name": "RICE UNIVERSITY"})
+            failing, _ = manager.submit("tuition", {"college_name": "Nowhere College"})
+            self.assertTrue(created)
+            self.assertFalse(duplicate_created)
+            self.assertEqual(first["id"], duplicate["id"])
+            while any(manager.store.get(j["id"])["status"] not in ("succeeded", "failed") for j in (first, failing)):
+                await asyncio.sleep(0.01)
+            # Watchers that stop waiting are forgotten; a finished job notifies nobody
+            update = manager.watch(first["id"])
+            manager.unwatch(first["id"], update)
+            self.assertEqual(manager._updates, {})
+            await manager.stop()
+            return manager.store.get(first["id"]), manager.store.get(failing["id"])
+
+        done, failed = asyncio.run(main())
+        self.assertEqual(done["result"], {"answer": "Tuition for Rice University"})
+        self.assertEqual((failed["status"], failed["error"]), ("failed", "no results"))
+        self.assertEqual(sorted(runs), ["Nowhere College", "Rice University"])
+
+        # A job that was running when the process stopped is picked up again
+        store = JobStore(self.db_path)
+        interrupted = store.create("tuition", {"college_name": "Duke University"})
+        store.set_status(interrupted["id"], "running")
+
+        async def restart():
+            manager = JobManager(JobStore(self.db_path), {"tuition": runner}, workers=1, reuse_ttl=3600)
+            await manager.start()
+            while manager.store.get(interrupted["id"])["status"] != "succeeded":
+                await asyncio.sleep(0.01)
+            await manager.stop()
+
+        asyncio.run(restart())
+        self.assertIn("Duke University", runs)
+
+    def test_job_endpoints(self):
+        import server
+
+        class FakeAgent:
+            def stream(self, inputs, stream_mode=None):
+                yield {"agent": {"messages": [AIMessage(content="", tool_calls=[{"name": "web_search", "args": {"query": "Rice tuition"}, "id": "c1"}])]}}
+                yield {"tools": {"messages": [ToolMessage(content="Tuition: $60,000", tool_call_id="c1", name="web_search")]}}
+                yield {"agent": {"messages": [AIMessage(content="Tuition is $60,000.\nSOURCES:\nhttps://rice.edu")]}}
+
+        async def main():
+            with patch.dict(os.environ, {"JOB_STORE_PATH": self.db_path}):
+                server.job_manager = server.build_job_manager()
+            await server.job_manager.start()
+            transport = httpx.ASGITransport(app=server.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                submitted = await client.post("/jobs", json={"kind": "tuition", "params": {"college_name": "Rice University"}})
+                job_id = submitted.json()["job_id"]
+                events = await client.get(f"/jobs/{job_id}/events")
+                resumed = await client.get(f"/jobs/{job_id}/events", headers={"Last-Event-ID": "1"})
+                malformed = await client.get(f"/jobs/{job_id}/events", headers={"Last-Event-ID": "not-a-number"})
+                job = await client.get(f"/jobs/{job_id}")
+                again = await client.post("/jobs", json={"kind": "tuition", "params": {"college_name": "rice university"}})
+                bad = await client.post("/jobs", json={"kind": "tuition", "params": {}})
+                missing = await client.get("/jobs/does-not-exist")
+            # Every SSE stream released its watcher when it ended
+            self.assertEqual(server.job_manager._updates, {})
+            await server.job_manager.stop()
+            return submitted, events, resumed, malformed, job, again, bad, missing
+
+        with patch("server.get_agent", return_value=FakeAgent()):
+            submitted, events, resumed, malformed, job, again, bad, missing = asyncio.run(main())
+
+        self.assertEqual(submitted.status_code, 202)
+        stream = parse_sse(events.text)
+        self.assertIn(("progress", {"type": "tool_call", "tool": "web_search", "args": {"query": "Rice tuition"}}), stream)
+        self.assertIn(("progress", {"type": "tool_result", "tool": "web_search", "chars": 16}), stream)
+        self.assertEqual(stream[-1], ("result", {"college_name": "Rice University", "tuition_info": "Tuition is $60,000.", "sources": ["https://rice.edu"]}))
+        # Resuming skips the progress already seen; an unreadable Last-Event-ID replays everything
+        progress = [event for event in stream if event[0] == "progress"]
+        self.assertEqual([e for e in parse_sse(resumed.text) if e[0] == "progress"], progress[1:])
+        self.assertEqual(malformed.status_code, 200)
+        self.assertEqual([e for e in parse_sse(malformed.text) if e[0] == "progress"], progress)
+        self.assertEqual(job.json()["status"], "succeeded")
+        self.assertEqual(again.json(), {"job_id": job.json()["id"], "status": "succeeded", "deduplicated": True})
+        self.assertEqual((bad.status_code, missing.status_code), (422, 404))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import os
+import sys
+import unittest
+
+# Add parent directory to path so we can import src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.ranking import select_passages, select_across_documents, split_passages, GAP_MARKER
+
+# A long cost-of-attendance page whose tuition table sits far past the first 10,000 characters
+FILLER = "\n".join(f"Campus news item {i}: the library extended its weekend hours." for i in range(300))
+PAGE = (
+    "Stanford University Cost of Attendance\n"
+    + FILLER
+    + "\nTuition and fees: $65,127\nRoom and board: $21,315\nTotal cost of attendance: $86,442\n"
+    + FILLER
+)
+
+class TestPassageRanking(unittest.TestCase):
+
+    def test_relevant_passage_beyond_cutoff_is_kept(self):
+        """The tuition table is returned even though truncation would have dropped it."""
+        self.assertNotIn("$65,127", PAGE[:10000])
+        result = select_passages(PAGE, "tuition fees room board", 10000)
+        self.assertIn("Tuition and fees: $65,127", result)
+        self.assertIn(GAP_MARKER, result)
+        self.assertLessEqual(len(result), 10000)
+
+    def test_opening_passage_is_kept(self):
+        result = select_passages(PAGE, "tuition fees room board", 2000)
+        self.assertTrue(result.startswith("Stanford University Cost of Attendance"))
+
+    def test_without_focus_falls_back_to_truncation(self):
+        self.assertEqual(select_passages(PAGE, "", 10000), PAGE[:10000])
+        self.assertEqual(select_passages("short page", "tuition", 10000), "short page")
+
+    def test_split_passages_preserves_text(self):
+        self.assertEqual("\n".join(split_passages(PAGE)), PAGE)
+
+    def test_combined_observation_orders_sources_by_relevance(self):
+        """scrape_many's combined output leads with the page that answers the query."""
+        documents = [
+            ("https://news.example.edu", "Campus News\n" + FILLER),
+            ("https://cost.example.edu", PAGE),
+        ]
+        result = select_across_documents(documents, "tuition fees room board", 6000)
+        self.assertTrue(result.startswith("SOURCE: https://cost.example.edu"))
+        self.assertIn("Tuition and fees: $65,127", result)
+        self.assertIn("SOURCE: https://news.example.edu", result)
+        self.assertLessEqual(len(result), 6000)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import asyncio
+import os
+import sys
+import time
+import unittest
+
+# Add parent directory to path so we can import src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.rate_limit import HostRateLimiter, RateLimitExceeded
+
+class TestHostRateLimiter(unittest.TestCase):
+
+    def test_burst_then_steady_rate(self):
+        """The first `burst` requests go straight through, later ones are spaced at `rate`."""
+        limiter = HostRateLimiter(rate=20, burst=2, max_wait=5)
+        start = time.monotonic()
+        for _ in range(4):
+            limiter.acquire("college.edu")
+        elapsed = time.monotonic() - start
+
+        self.assertGreaterEqual(elapsed, 0.09)
+        stats = limiter.stats()["college.edu"]
+        self.assertEqual(stats["requests"], 4)
+        self.assertEqual(stats["delayed"], 2)
+        self.assertEqual(stats["queued"], 0)
+
+    def test_hosts_are_independent(self):
+        limiter = HostRateLimiter(rate=1, burst=1, max_wait=0.5)
+        limiter.acquire("a.edu")
+        limiter.acquire("b.edu")
+        with self.assertRaises(RateLimitExceeded):
+            limiter.acquire("a.edu")
+        self.assertEqual(limiter.stats()["a.edu"]["rejected"], 1)
+
+    def test_async_waiters_queue(self):
+        """Concurrent async callers are admitted one slot apart without blocking the loop."""
+        limiter = HostRateLimiter(rate=50, burst=1, max_wait=5)
+
+        async def run():
+            start = time.monotonic()
+            await asyncio.gather(*(limiter.aacquire("html.duckduckgo.com") for _ in range(5)))
+            return time.monotonic() - start
+
+        elapsed = asyncio.run(run())
+        self.assertGreaterEqual(elapsed, 0.07)
+        self.assertLess(elapsed, 1.0)
+
+    def test_penalize_holds_back_host(self):
+        limiter = HostRateLimiter(rate=10, burst=5, max_wait=0.5)
+        limiter.penalize("throttled.edu", 2)
+        with self.assertRaises(RateLimitExceeded):
+            limiter.acquire("throttled.edu")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Add parent directory to path so we can import src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.cassette import CassetteStore
+from src.http_client import fetch, UnsupportedContentType
+from src.tools import web_search, scrape_webpage, SEARCH_URL
+
+SEARCH_PAGE = b"""<html><body>
+<div class="result"><a class="result__a" href="https://cost.example.edu/attendance">Cost of Attendance</a>
+<a class="result__snippet">Tuition, fees, room and board for 2025-26.</a></div>
+</body></html>"""
+
+COST_PAGE = b"""<html><head><title>Cost of Attendance</title></head><body>
+<table><tr><td>Tuition and fees</td><td>$65,127</td></tr><tr><td>Room and board</td><td>$21,315</td></tr></table>
+</body></html>"""
+
+class TestReplay(unittest.TestCase):
+    """Runs the research tools against a cassette store with the network switched off."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        store = CassetteStore(self.tmpdir.name)
+        store.save("POST", SEARCH_URL, {"q": "offline replay tuition"}, 200, SEARCH_URL,
+                   {"Content-Type": "text/html"}, SEARCH_PAGE, False)
+        store.save("GET", "https://cost.example.edu/attendance", None, 200, "https://cost.example.edu/attendance",
+                   {"Content-Type": "text/html; charset=utf-8"}, COST_PAGE, False)
+
+        self.saved_env = dict(os.environ)
+        os.environ.update({
+            "HTTP_CASSETTE_MODE": "replay",
+            "HTTP_CASSETTE_DIR": self.tmpdir.name,
+            "HTTP_REPLAY_LATENCY_MS": "5",
+            "PAGE_CACHE_TTL": "0"
+        })
+
+    def tearDown(self):
+        os.environ.clear()
+        os.environ.update(self.saved_env)
+        self.tmpdir.cleanup()
+
+    def test_sync_tools_replay(self):
+        self.assertIn("https://cost.example.edu/attendance", web_search.invoke("offline replay tuition"))
+        self.assertIn("$65,127", scrape_webpage.invoke({"url": "https://cost.example.edu/attendance"}))
+
+    def test_async_tools_replay(self):
+        result = asyncio.run(scrape_webpage.ainvoke({"url": "https://cost.example.edu/attendance?utm_source=x"}))
+        self.assertIn("$21,315", result)
+
+    def test_unrecorded_request_fails_without_network(self):
+        result = scrape_webpage.invoke({"url": "https://not-recorded.example.edu"})
+        self.assertTrue(result.startswith("Error scraping"))
+        self.assertIn("no recorded response", result)
+
+    def test_recorded_errors_replay(self):
+        """A request that failed while recording fails the same way on replay."""
+        timeout_url = "https://slow.example.edu/tuition"
+        pdf_url = "https://cost.example.edu/brochure.pdf"
+        os.environ["HTTP_CASSETTE_MODE"] = "record"
+        with patch("src.http_client._live_fetch", side_effect=TimeoutError("Read timed out")):
+            recorded = scrape_webpage.invoke({"url": timeout_url})
+        with patch("src.http_client._live_fetch", side_effect=UnsupportedContentType("unsupported content type application/pdf")):
+            with self.assertRaises(UnsupportedContentType):
+                fetch("GET", pdf_url)
+
+        os.environ["HTTP_CASSETTE_MODE"] = "replay"
+        self.assertEqual(scrape_webpage.invoke({"url": timeout_url}), recorded)
+        self.assertIn("Read timed out", recorded)
+        with self.assertRaisesRegex(UnsupportedContentType, "application/pdf"):
+            fetch("GET", pdf_url)
+
+if __name__ == '__main__':
+    unittest.main()
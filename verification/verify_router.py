@@ -0,0 +1,56 @@
+import os
+import sys
+import unittest
+from langchain_core.messages import AIMessage
+from langgraph.graph import END
+
+# Add parent directory to path so we can import src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.orchestrator import pending_research, route_from_state, route_orchestrator, OrchestratorState
+
+def make_state(**overrides):
+    state = OrchestratorState(
+        messages=[], college_name="", major="", location="",
+        tuition_found=False, salary_found=False, taxes_found=False, living_costs_found=False
+    )
+    state.update(overrides)
+    return state
+
+class TestRouter(unittest.TestCase):
+
+    def test_dispatch_rules(self):
+        """Research is dispatched from the state alone, as soon as its inputs are known."""
+        self.assertEqual(pending_research(make_state()), [])
+        self.assertEqual(pending_research(make_state(college_name="Stanford University")), ["tuition_agent"])
+        self.assertEqual(pending_research(make_state(college_name="Stanford University", tuition_found=True)), [])
+        self.assertEqual(
+            pending_research(make_state(college_name="Stanford University", tuition_found=True, major="Economics")),
+            ["salary_agent"]
+        )
+        done_salary = dict(college_name="Stanford University", major="Economics", location="Austin, TX",
+                           tuition_found=True, salary_found=True)
+        self.assertEqual(pending_research(make_state(**done_salary)), ["tax_agent", "cost_of_living_agent"])
+        self.assertEqual(pending_research(make_state(**done_salary, taxes_found=True)), ["cost_of_living_agent"])
+        self.assertEqual(pending_research(make_state(**done_salary, taxes_found=True, living_costs_found=True)), [])
+
+    def test_independent_research_fans_out(self):
+        """With every target known up front, all four agents run in the same step."""
+        state = make_state(college_name="Stanford University", major="Economics", location="Austin, TX")
+        self.assertEqual(
+            route_from_state(state),
+            ["tuition_agent", "salary_agent", "tax_agent", "cost_of_living_agent"]
+        )
+
+    def test_llm_only_when_talking(self):
+        self.assertEqual(route_from_state(make_state()), "orchestrator")
+        self.assertEqual(route_from_state(make_state(college_name="Stanford University")), ["tuition_agent"])
+
+    def test_route_tag_fallback_ignores_finished_research(self):
+        tagged = [AIMessage(content="Let me look that up. [ROUTE: TUITION]")]
+        self.assertEqual(route_orchestrator(make_state(messages=tagged)), "tuition_agent")
+        self.assertEqual(route_orchestrator(make_state(messages=tagged, tuition_found=True)), END)
+        self.assertEqual(route_orchestrator(make_state(messages=[AIMessage(content="Which college?")])), END)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import os
+import sys
+import time
+import asyncio
+import unittest
+from unittest.mock import patch
+import httpx
+from langchain_core.messages import AIMessage
+
+# Add parent directory to path so we can import src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.singleflight import SingleFlight, flight_key
+
+class TestSingleFlight(unittest.TestCase):
+
+    def test_concurrent_identical_calls_share_one_run(self):
+        flights = SingleFlight()
+        runs = []
+
+        async def research():
+            runs.append(1)
+            await asyncio.sleep(0.05)
+            return "Tuition is $60,000."
+
+        async def main():
+            keys = [flight_key("tuition", name) for name in ["Stanford University", "stanford university ", "STANFORD UNIVERSITY"] * 10]
+            return await asyncio.gather(*(flights.do(key, research) for key in keys))
+
+        results = asyncio.run(main())
+        self.assertEqual(len(runs), 1)
+        self.assertEqual(set(results), {"Tuition is $60,000."})
+        self.assertEqual(flights.stats()["topics"]["tuition"], {"executions": 1, "coalesced": 29, "suppressed": 0.967})
+        self.assertEqual(flights.stats()["in_flight"], 0)
+
+    def test_completed_calls_are_not_cached(self):
+        flights = SingleFlight()
+        runs = []
+
+        async def research():
+            runs.append(1)
+            return len(runs)
+
+        async def main():
+            first = await flights.do(flight_key("tuition", "Rice University"), research)
+            second = await flights.do(flight_key("tuition", "Rice University"), research)
+            return first, second
+
+        self.assertEqual(asyncio.run(main()), (1, 2))
+
+    def test_errors_reach_every_waiter_and_a_cancelled_waiter_does_not_stop_the_run(self):
+        flights = SingleFlight()
+
+        async def failing():
+            await asyncio.sleep(0.02)
+            raise RuntimeError("search failed")
+
+        async def slow():
+            await asyncio.sleep(0.05)
+            return "done"
+
+        async def main():
+            failures = await asyncio.gather(*(flights.do(("taxes", "austin tx"), failing) for _ in range(3)), return_exceptions=True)
+            impatient = asyncio.ensure_future(flights.do(("salary", "rice university"), slow))
+            patient = asyncio.ensure_future(flights.do(("salary", "rice university"), slow))
+            await asyncio.sleep(0.01)
+            impatient.cancel()
+            return failures, await patient
+
+        failures, result = asyncio.run(main())
+        self.assertTrue(all(isinstance(e, RuntimeError) for e in failures))
+        self.assertEqual(result, "done")
+
+    def test_college_endpoint_coalesces_requests(self):
+        import server
+
+        class SlowAgent:
+            calls = 0
+
+            def invoke(self, inputs):
+                SlowAgent.calls += 1
+                time.sleep(0.1)
+                return {"messages": [AIMessage(content="Tuition is $60,000.\nSOURCES:\nhttps://example.edu")]}
+
+        async def main():
+            transport = httpx.ASGITransport(app=server.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await asyncio.gather(*(client.get("/college/Duke University") for _ in range(10)))
+
+        with patch("server.get_agent", return_value=SlowAgent()):
+            responses = asyncio.run(main())
+        self.assertEqual(SlowAgent.calls, 1)
+        self.assertTrue(all(r.status_code == 200 for r in responses))
+        self.assertEqual(responses[0].json()["sources"], ["https://example.edu"])
+
+if __name__ == '__main__':
+    unittest.main()
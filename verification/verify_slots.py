@@ -0,0 +1,161 @@
+import os
+import sys
+import unittest
+from unittest.mock import patch
+from langchain_core.messages import AIMessage, HumanMessage
+
+# Add parent directory to path so we can import src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.slots import parse_slots, slot_updates
+from src.orchestrator import extract_slots_node, research_request, OrchestratorState
+
+def make_state(**overrides):
+    state = OrchestratorState(
+        messages=[], college_name="", major="", location="",
+        tuition_found=False, salary_found=False, taxes_found=False, living_costs_found=False
+    )
+    state.update(overrides)
+    return state
+
+class TestSlots(unittest.TestCase):
+
+    def test_parse_full_message(self):
+        slots = parse_slots("I'm going to Stanford University to major in computer science and then move to Austin, Texas")
+        self.assertEqual(slots, {
+            "college_name": "Stanford University",
+            "major": "Computer Science",
+            "location": "Austin, TX"
+        })
+
+    def test_aliases_and_longest_name(self):
+        self.assertEqual(parse_slots("thinking about MIT")["college_name"], "Massachusetts Institute of Technology")
+        self.assertEqual(
+            parse_slots("Massachusetts Institute of Technology")["college_name"],
+            "Massachusetts Institute of Technology"
+        )
+        self.assertEqual(parse_slots("University of Michigan")["college_name"], "University of Michigan")
+        self.assertEqual(parse_slots("econ major")["major"], "Economics")
+        self.assertEqual(parse_slots("I'm undecided")["major"], "Undecided")
+
+    def test_major_before_college_name(self):
+        self.assertEqual(
+            parse_slots("I want to study Computer Science at Stanford University"),
+            {"college_name": "Stanford University", "major": "Computer Science"}
+        )
+        self.assertEqual(parse_slots("Economics at Rice University")["college_name"], "Rice University")
+        self.assertEqual(parse_slots("Nursing at Ohio State University")["college_name"], "Ohio State University")
+        self.assertEqual(parse_slots("Pre-Med at Emory University")["college_name"], "Emory University")
+        self.assertEqual(parse_slots("University of Texas at Austin")["college_name"], "University of Texas at Austin")
+
+    def test_major_after_contraction(self):
+        self.assertEqual(parse_slots("I'm a computer science major"), {"major": "Computer Science"})
+        self.assertEqual(
+            parse_slots("I'm an English major at Yale University"),
+            {"college_name": "Yale University", "major": "English"}
+        )
+
+    def test_everyday_phrases_are_not_majors(self):
+        # Nothing is committed; the node hands these messages to the LLM extractor
+        for text in ("Is this a major expense?", "I am a double major", "I plan to study hard",
+                     "study abroad at Duke University", "Can you study the costs for me?"):
+            self.assertNotIn("major", parse_slots(text), text)
+
+    def test_qualified_university_names(self):
+        self.assertEqual(
+            parse_slots("State University of New York at Buffalo")["college_name"],
+            "State University of New York at Buffalo"
+        )
+
+    def test_current_residence_is_not_the_location(self):
+        self.assertEqual(parse_slots("I live in Portland, OR now"), {})
+        self.assertEqual(parse_slots("I'd like to work in Seattle, WA after college"), {"location": "Seattle, WA"})
+
+    def test_unreadable_major_phrases(self):
+        self.assertEqual(parse_slots("My major will be CS"), {"major": "Computer Science"})
+        self.assertEqual(
+            parse_slots("Going to Georgia Tech, major in ME"),
+            {"college_name": "Georgia Institute of Technology", "major": "Mechanical Engineering"}
+        )
+        # A rejected capture returns nothing, leaving the whole message to the LLM extractor
+        self.assertEqual(parse_slots("I plan to study at Harvard"), {})
+        self.assertEqual(parse_slots("I want to major in what pays best"), {})
+
+    def test_location_needs_context(self):
+        self.assertEqual(parse_slots("Ann Arbor, MI")["location"], "Ann Arbor, MI")
+        self.assertNotIn("location", parse_slots("My cousin went to a school near Ann Arbor, MI a few years ago and loved it"))
+
+    def test_changing_a_slot_resets_dependent_research(self):
+        state = make_state(college_name="Stanford University", tuition_found=True, salary_found=True, taxes_found=True)
+        self.assertEqual(slot_updates(state, {"college_name": "stanford university."}), {})
+        self.assertEqual(
+            slot_updates(state, {"college_name": "Rice University"}),
+            {"college_name": "Rice University", "tuition_found": False, "salary_found": False}
+        )
+
+    def test_node_skips_llm_when_regex_matches(self):
+        state = make_state(messages=[HumanMessage(content="I'll attend Duke University")])
+        with patch("src.orchestrator._extract_slots_with_llm") as llm:
+            self.assertEqual(
+                extract_slots_node(state),
+                {"college_name": "Duke University", "tuition_found": False, "salary_found": False}
+            )
+            llm.assert_not_called()
+
+    def test_node_falls_back_to_llm_for_answers(self):
+        state = make_state(messages=[
+            AIMessage(content="Which school are you planning to attend?"),
+            HumanMessage(content="the one in Palo Alto")
+        ])
+        with patch("src.orchestrator._extract_slots_with_llm", return_value={"college_name": "Stanford University"}) as llm:
+            self.assertEqual(
+                extract_slots_node(state),
+                {"college_name": "Stanford University", "tuition_found": False, "salary_found": False}
+            )
+            llm.assert_called_once()
+        with patch("src.orchestrator._extract_slots_with_llm") as llm:
+            extract_slots_node(make_state(messages=[HumanMessage(content="hello!")]))
+            llm.assert_not_called()
+
+    def test_node_asks_llm_about_partial_matches(self):
+        state = make_state(messages=[HumanMessage(content="UT Austin for econ")])
+        with patch("src.orchestrator._extract_slots_with_llm",
+                   return_value={"college_name": "UT Austin", "major": "Economics"}) as llm:
+            self.assertEqual(extract_slots_node(state), {
+                "college_name": "University of Texas at Austin", "major": "Economics",
+                "tuition_found": False, "salary_found": False
+            })
+            llm.assert_called_once()
+
+    def test_node_falls_back_to_llm_for_rejected_major(self):
+        state = make_state(messages=[HumanMessage(content="I plan to study at Harvard")])
+        with patch("src.orchestrator._extract_slots_with_llm", return_value={"college_name": "Harvard University"}) as llm:
+            self.assertEqual(
+                extract_slots_node(state),
+                {"college_name": "Harvard University", "tuition_found": False, "salary_found": False}
+            )
+            llm.assert_called_once()
+
+    def test_node_extracts_from_cli_opening_prompt(self):
+        # The opening message main.py sends has no regex match but names a college
+        state = make_state(messages=[HumanMessage(content="Find the per-year tuition cost for Stanford")])
+        with patch("src.orchestrator._extract_slots_with_llm", return_value={"college_name": "Stanford University"}) as llm:
+            self.assertEqual(
+                extract_slots_node(state),
+                {"college_name": "Stanford University", "tuition_found": False, "salary_found": False}
+            )
+            llm.assert_called_once()
+
+    def test_precise_research_requests(self):
+        self.assertEqual(
+            research_request("salary", "Rice University", "Economics", ""),
+            "Find the average expected starting salary for graduates of Rice University majoring in Economics"
+        )
+        self.assertEqual(
+            research_request("salary", "Rice University", "Undecided", ""),
+            "Find the average expected starting salary for graduates of Rice University"
+        )
+        self.assertEqual(research_request("taxes", "Rice University", "", ""), "")
+
+if __name__ == '__main__':
+    unittest.main()
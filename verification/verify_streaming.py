@@ -0,0 +1,160 @@
+import os
+import sys
+import json
+import asyncio
+import unittest
+from unittest.mock import patch
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
+from langchain_core.outputs import ChatGenerationChunk
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.prebuilt import create_react_agent
+
+# Add parent directory to path so we can import src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ["FACT_STORE_ENABLED"] = "false"
+
+from src.tools import web_search
+from src.orchestrator import build_orchestrator_workflow
+from server import graph_events
+
+class FakeToolModel(GenericFakeChatModel):
+    """Fake chat model that can stream tool calls as well as text."""
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        message = next(self.messages)
+        if message.tool_calls:
+            chunk_calls = [
+                {"name": c["name"], "args": json.dumps(c["args"]), "id": c["id"], "index": i}
+                for i, c in enumerate(message.tool_calls)
+            ]
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content="", tool_call_chunks=chunk_calls))
+            if run_manager:
+                run_manager.on_llm_new_token("", chunk=chunk)
+            yield chunk
+            return
+        for word in message.content.split(" "):
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=word + " "))
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+def parse_sse(frame):
+    event_line, data_line = frame.rstrip("\n").split("\n")
+    return event_line[len("event: "):], json.loads(data_line[len("data: "):])
+
+class TestSubAgentStreaming(unittest.TestCase):
+
+    def collect(self):
+        agent_model = FakeToolModel(messages=iter([
+            AIMessage(content="", tool_calls=[{"name": "web_search", "args": {"query": "Stanford tuition"}, "id": "call-1"}]),
+            AIMessage(content="Tuition at Stanford is $65,127 per year."),
+        ]))
+        orchestrator_model = FakeToolModel(messages=iter([AIMessage(content="What major are you planning?")]))
+
+        async def fake_search(query: str) -> str:
+            return "Stanford tuition 2025-2026: $65,127"
+
+        with patch("src.orchestrator.get_agent", return_value=create_react_agent(agent_model, [web_search])), \
+             patch("src.orchestrator.get_model", return_value=orchestrator_model), \
+             patch("src.tools._aweb_search", fake_search):
+            graph = build_orchestrator_workflow().compile(checkpointer=MemorySaver())
+            inputs = {"messages": [HumanMessage(content="I'm going to Stanford University")]}
+            config = {"configurable": {"thread_id": "stream-test"}}
+
+            async def run():
+                return [frame async for frame in graph_events(graph, inputs, config, ["messages-tuple", "values"])]
+            return asyncio.run(run())
+
+    def test_sub_agent_events_are_forwarded(self):
+        frames = self.collect()
+        for frame in frames:
+            self.assertTrue(frame.startswith("event: ") and frame.endswith("\n\n"))
+        events = [parse_sse(frame) for frame in frames]
+
+        sub_agent = [data for event, data in events if event == "messages-tuple" and data[1].get("parent_node") == "tuition_agent"]
+        self.assertTrue(any(m.get("tool_call_chunks") for m, _ in sub_agent), "tool call not streamed")
+        self.assertTrue(any(m["type"] == "tool" for m, _ in sub_agent), "tool result not streamed")
+        answer_tokens = [m["content"] for m, meta in sub_agent if m["type"] == "AIMessageChunk" and m["content"]]
+        self.assertGreater(len(answer_tokens), 1)
+        self.assertIn("$65,127", "".join(answer_tokens))
+
+        # The first sub-agent event arrives before the node finishes
+        first_sub_event = next(i for i, (event, data) in enumerate(events)
+                               if event == "messages-tuple" and data[1].get("parent_node"))
+        tuition_done = next(i for i, (event, data) in enumerate(events)
+                            if event == "values" and data.get("tuition_found"))
+        self.assertLess(first_sub_event, tuition_done)
+
+    def test_values_describe_only_the_thread(self):
+        for event, data in map(parse_sse, self.collect()):
+            if event == "values":
+                self.assertEqual(data["messages"][0]["content"], "I'm going to Stanford University")
+
+class TestAgentClientStreaming(unittest.TestCase):
+
+    def test_shared_agent_client_streams_under_messages_mode(self):
+        from uuid import uuid4
+        from langchain_core.callbacks import AsyncCallbackManagerForLLMRun
+        try:
+            from langgraph.pregel._messages import StreamMessagesHandler
+        except ImportError:
+            from langgraph.pregel.messages import StreamMessagesHandler
+        from src.agent import get_llm
+
+        # The real agent client, not a fake model that never sets the streaming flag
+        with patch.dict(os.environ, {"OPEN_ROUTER_API_KEY": "test-key"}), \
+             patch.dict("src.agent._models", clear=True):
+            model = get_llm()
+            streaming_model = get_llm(streaming=True)
+
+        handler = StreamMessagesHandler(lambda chunk: None, True)
+        run_manager = AsyncCallbackManagerForLLMRun(run_id=uuid4(), handlers=[handler], inheritable_handlers=[])
+        self.assertTrue(model._should_stream(async_api=True, run_manager=run_manager))
+        self.assertTrue(streaming_model._should_stream(async_api=True, run_manager=run_manager))
+        # Without a streaming consumer, blocking /college calls still make one request
+        self.assertFalse(model._should_stream(async_api=True, run_manager=None))
+
+class TestUpdatesMode(unittest.TestCase):
+
+    def test_updates_carry_only_new_messages(self):
+        orchestrator_model = FakeToolModel(messages=iter([
+            AIMessage(content="Which college are you considering?"),
+            AIMessage(content="Noted. What major?"),
+        ]))
+        class FakeAgent:
+            async def ainvoke(self, inputs):
+                return {"messages": [AIMessage(content="Tuition at Rice is $60,000.")]}
+
+        with patch("src.orchestrator.get_model", return_value=orchestrator_model), \
+             patch("src.orchestrator.get_agent", return_value=FakeAgent()), \
+             patch("src.orchestrator._aextract_slots_with_llm", return_value={}):
+            graph = build_orchestrator_workflow().compile(checkpointer=MemorySaver())
+            config = {"configurable": {"thread_id": "updates-test"}}
+
+            async def turn(text):
+                inputs = {"messages": [HumanMessage(content=text)]}
+                return [frame async for frame in graph_events(graph, inputs, config, ["updates"])]
+
+            asyncio.run(turn("Hi there"))
+            second = [parse_sse(frame) for frame in asyncio.run(turn("Thinking about Rice University"))]
+
+        self.assertTrue(all(event == "updates" for event, _ in second))
+        sent = [m["content"] for _, delta in second for changes in delta.values() for m in changes.get("messages", [])]
+        # Earlier turns are not re-sent
+        self.assertEqual(sent, ["Tuition at Rice is $60,000.", "Noted. What major?"])
+        slots = next(changes for _, delta in second for node, changes in delta.items() if node == "extract_slots")
+        self.assertEqual(slots["college_name"], "Rice University")
+
+    def test_removed_messages_are_reported(self):
+        from langchain_core.messages import RemoveMessage
+        from src.sse import serialize_update
+        delta = serialize_update({"manage_history": {"summary": "Earlier: asked about Rice.", "messages": [RemoveMessage(id="m1")]}, "router": None})
+        self.assertEqual(delta, {"manage_history": {"summary": "Earlier: asked about Rice.", "messages": [{"type": "remove", "id": "m1"}]}})
+
+if __name__ == '__main__':
+    unittest.main()
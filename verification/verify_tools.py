@@ -1,4 +1,5 @@
 from src.tools import web_search, scrape_webpage
+import asyncio
 import sys
 
 def test_tools():
@@ -21,6 +22,23 @@ def test_tools():
     except Exception as e:
         print(f"Scrape Tool Failed: {e}")
         sys.exit(1)
+
+    print("\nTesting async tool implementations...")
+    try:
+        async def run_async():
+            return await asyncio.gather(
+                web_search.ainvoke("University of California Berkeley tuition"),
+                scrape_webpage.ainvoke("https://www.example.com")
+            )
+        async_search, async_scrape = asyncio.run(run_async())
+        print(f"Async Search Result (first 100 chars): {async_search[:100]}...")
+        print(f"Async Scrape Result: {async_scrape[:100]}...")
+        if async_scrape.startswith("Error scraping"):
+            print("Async scrape tool returned an error.")
+            sys.exit(1)
+    except Exception as e:
+        print(f"Async Tools Failed: {e}")
+        sys.exit(1)
         
     print("\nTools verification successful!")
 
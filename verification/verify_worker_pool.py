@@ -0,0 +1,98 @@
+import os
+import sys
+import time
+import asyncio
+import unittest
+from unittest.mock import patch
+import httpx
+from langchain_core.messages import AIMessage
+
+# Add parent directory to path so we can import src
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.worker_pool import WorkerPool, PoolSaturated
+
+def blocking_research(seconds):
+    time.sleep(seconds)
+    return "done"
+
+class TestWorkerPool(unittest.TestCase):
+
+    def test_admission_control(self):
+        pool = WorkerPool(workers=2, queue_size=2)
+
+        async def main():
+            return await asyncio.gather(*(pool.run(blocking_research, 0.1) for _ in range(6)), return_exceptions=True)
+
+        results = asyncio.run(main())
+        self.assertEqual(results.count("done"), 4)
+        rejected = [r for r in results if isinstance(r, PoolSaturated)]
+        self.assertEqual(len(rejected), 2)
+        self.assertGreaterEqual(rejected[0].retry_after, 1)
+
+        stats = pool.stats()
+        self.assertEqual((stats["completed"], stats["rejected"], stats["running"], stats["queued"]), (4, 2, 0, 0))
+        # Two jobs waited for a worker to free up
+        self.assertGreater(stats["p95_wait_s"], 0.05)
+        pool.shutdown()
+
+    def test_cancelled_queued_caller_frees_its_slot(self):
+        pool = WorkerPool(workers=1, queue_size=1)
+
+        async def main():
+            running = asyncio.ensure_future(pool.run(blocking_research, 0.2))
+            waiting = asyncio.ensure_future(pool.run(blocking_research, 0.2))
+            await asyncio.sleep(0.05)
+            # The client behind the queued request disconnects before a worker is free
+            waiting.cancel()
+            await asyncio.sleep(0)
+            self.assertEqual(pool.stats()["queued"], 0)
+            await running
+            # The freed slot admits new work again
+            return await pool.run(blocking_research, 0.01)
+
+        self.assertEqual(asyncio.run(main()), "done")
+        stats = pool.stats()
+        self.assertEqual((stats["running"], stats["queued"], stats["completed"], stats["cancelled"]), (0, 0, 2, 1))
+        pool.shutdown()
+
+    def test_event_loop_stays_responsive(self):
+        pool = WorkerPool(workers=2, queue_size=0)
+
+        async def main():
+            ticks = 0
+            work = asyncio.gather(pool.run(blocking_research, 0.3), pool.run(blocking_research, 0.3))
+            while not work.done():
+                ticks += 1
+                await asyncio.sleep(0.01)
+            await work
+            return ticks
+
+        self.assertGreater(asyncio.run(main()), 10)
+        pool.shutdown()
+
+    def test_overloaded_endpoint_returns_503(self):
+        import server
+
+        class SlowAgent:
+            def invoke(self, inputs):
+                time.sleep(0.2)
+                return {"messages": [AIMessage(content="Net price is $20,000.")]}
+
+        pool = WorkerPool(workers=1, queue_size=1)
+        body = {"college_name": "Rice University", "family_contribution": 10000, "financial_aid": 30000}
+
+        async def main():
+            transport = httpx.ASGITransport(app=server.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await asyncio.gather(*(client.post("/personalized-cost", json=body) for _ in range(4)))
+
+        with patch("server.get_agent", return_value=SlowAgent()), patch("server.research_pool", pool):
+            responses = asyncio.run(main())
+        codes = sorted(r.status_code for r in responses)
+        self.assertEqual(codes, [200, 200, 503, 503])
+        self.assertTrue(all(r.headers.get("Retry-After") for r in responses if r.status_code == 503))
+        pool.shutdown()
+
+if __name__ == '__main__':
+    unittest.main()